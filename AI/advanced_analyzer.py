@@ -18,6 +18,8 @@ from sklearn.model_selection import train_test_split
 import warnings
 warnings.filterwarnings('ignore')
 
+from dataset_registry import registry
+
 class AdvancedTimeSeriesAnalyzer:
     """
     Advanced time series analysis with multiple modeling approaches
@@ -31,8 +33,7 @@ class AdvancedTimeSeriesAnalyzer:
     def load_data(self, filepath, date_column='date', value_column='rate'):
         """Load and prepare time series data"""
         try:
-            self.data = pd.read_csv(filepath)
-            self.data[date_column] = pd.to_datetime(self.data[date_column])
+            self.data = registry.get_frame(filepath, date_column)
             self.data = self.data.set_index(date_column)
             self.data = self.data[[value_column]].dropna()
             print(f"Data loaded: {len(self.data)} records")
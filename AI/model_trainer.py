@@ -11,6 +11,8 @@ from statsmodels.tsa.statespace.sarimax import SARIMAX
 import warnings
 warnings.filterwarnings('ignore')
 
+from fit_cache import fit_cache
+
 class ModelTrainer:
     """
     Train and compare SARIMA and regression models
@@ -68,7 +70,7 @@ class ModelTrainer:
                           enforce_stationarity=False,
                           enforce_invertibility=False)
             
-            fitted_model = model.fit(disp=False)
+            fitted_model = fit_cache.fit(model, disp=False)
             self.models['sarima'] = fitted_model
             return fitted_model
         except Exception as e:
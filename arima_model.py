@@ -13,6 +13,11 @@ import warnings
 warnings.filterwarnings('ignore')
 
 from config import VALUE_COLUMN, TEST_SIZE
+from fit_cache import fit_cache
+from model_update import extend_fit
+from backtest import rolling_backtest
+from arima_search import (evaluate_orders, grid_orders, rebuild_fit, search_table, select_best,
+                          stepwise_search)
 
 class ARIMAModel:
     def __init__(self, data):
@@ -21,6 +26,8 @@ class ARIMAModel:
         self.model_fit = None
         self.forecast = None
         self.train_size = None
+        self.search_results = None
+        self.backtest_results = None
         self.setup_plot_style()
     
     def setup_plot_style(self):
@@ -39,53 +46,98 @@ class ARIMAModel:
         print(f"Training period: {self.train_data.index.min()} to {self.train_data.index.max()}")
         print(f"Test period: {self.test_data.index.min()} to {self.test_data.index.max()}")
     
-    def find_best_arima(self, p_range=range(0, 3), d_range=range(0, 2), q_range=range(0, 3)):
-        """Find best ARIMA parameters using AIC criterion"""
-        best_aic = np.inf
-        best_order = None
-        best_model = None
-        
-        print("Searching for best ARIMA parameters...")
-        
-        for p in p_range:
-            for d in d_range:
-                for q in q_range:
-                    try:
-                        model = ARIMA(self.train_data, order=(p, d, q))
-                        fitted_model = model.fit()
-                        
-                        if fitted_model.aic < best_aic:
-                            best_aic = fitted_model.aic
-                            best_order = (p, d, q)
-                            best_model = fitted_model
-                            
-                        print(f"ARIMA({p},{d},{q}) - AIC: {fitted_model.aic:.2f}")
-                        
-                    except Exception as e:
-                        continue
-        
-        print(f"\nBest model: ARIMA{best_order} with AIC: {best_aic:.2f}")
-        return best_order, best_model
+    def find_best_arima(self, p_range=None, d_range=None, q_range=None,
+                        workers=1, method='grid', test='kpss'):
+        """
+        Find best ARIMA parameters using AIC criterion
+        
+        method='grid' fits every order of the ranges; method='stepwise'
+        chooses d with a unit-root test ('kpss' or 'adf') and walks
+        neighbouring orders within the ranges while the AIC improves.
+        Ranges left as None default to p, q < 3 and d < 2 for the grid,
+        and to p, q <= 5 and d <= 2 for stepwise, which fits only a few
+        of those orders.
+        Ties are broken by the smallest order, so the serial (workers=1) and
+        parallel searches select the same model. The AIC and fit time of
+        every fitted order are kept in self.search_results.
+        """
+        print(f"Searching for best ARIMA parameters ({method})...")
+        
+        if method == 'grid':
+            orders = grid_orders(p_range or range(0, 3), d_range or range(0, 2), q_range or range(0, 3))
+            candidates = evaluate_orders(self.train_data, orders, workers)
+        elif method == 'stepwise':
+            _, candidates = stepwise_search(self.train_data, p_range or range(0, 6), d_range or range(0, 3),
+                                            q_range or range(0, 6), test, workers)
+        else:
+            raise ValueError(f"Unknown search method: {method}")
+        
+        for candidate in candidates:
+            if candidate['params'] is not None:
+                print(f"ARIMA{candidate['order']} - AIC: {candidate['aic']:.2f} "
+                      f"({candidate['fit_time']:.2f}s)")
+        
+        self.search_results = search_table(candidates)
+        best = select_best(candidates)
+        if best is None:
+            print("\nNo ARIMA order could be fitted")
+            return None, None
+        
+        print(f"\nBest model: ARIMA{best['order']} with AIC: {best['aic']:.2f}")
+        # Only the winner is rebuilt into a results object
+        return best['order'], rebuild_fit(self.train_data, best['order'], best['params'])
     
-    def train_model(self, order=None):
-        """Train ARIMA model with specified order or find best order"""
+    def train_model(self, order=None, workers=1, method='grid', p_range=None, d_range=None, q_range=None):
+        """Train ARIMA model with specified order or find best order (grid or stepwise search)"""
         if order is None:
             print("No order specified. Finding best ARIMA order...")
-            best_order, self.model_fit = self.find_best_arima()
+            best_order, self.model_fit = self.find_best_arima(p_range, d_range, q_range,
+                                                              workers=workers, method=method)
             self.order = best_order
         else:
             print(f"Training ARIMA{order} model...")
             self.order = order
             model = ARIMA(self.train_data, order=order)
-            self.model_fit = model.fit()
+            self.model_fit = fit_cache.fit(model)
         
         print("\nModel Summary:")
         print(self.model_fit.summary())
         
         return self.model_fit
     
+    def update_model(self, new_observations, mode='filter'):
+        """
+        Extend the trained model with observations that follow the training data
+        
+        mode='filter' keeps the fitted parameters and only runs the Kalman
+        filter over the extended series; mode='refit' re-estimates them,
+        starting the optimizer from the previous parameters. Test
+        observations up to the last absorbed date are dropped from the
+        test data, so validation only scores unseen observations.
+        """
+        if self.model_fit is None:
+            print("No model fitted. Run train_model first.")
+            return None
+        
+        self.model_fit = extend_fit(self.model_fit, new_observations, mode)
+        self.train_data = pd.concat([self.train_data, new_observations])
+        print(f"ARIMA{self.order} updated with {len(new_observations)} observations ({mode})")
+        
+        # The model has seen these test observations now
+        absorbed = self.test_data.index <= new_observations.index.max()
+        if absorbed.any():
+            self.test_data = self.test_data[~absorbed]
+            print(f"Dropped {absorbed.sum()} absorbed observations from the test data "
+                  f"({len(self.test_data)} left)")
+        
+        return self.model_fit
+    
     def validate_model(self, steps=None):
         """Validate model on test data"""
+        if len(self.test_data) == 0:
+            print("No test data left to validate on.")
+            return None, None
+        
         if steps is None:
             steps = len(self.test_data)
         
@@ -112,6 +164,37 @@ class ARIMAModel:
         
         return metrics, self.forecast
     
+    def backtest(self, order=None, horizon=5, step=20, initial=None, window=None,
+                 workers=1, reuse_params=False):
+        """
+        Rolling-origin backtest over the whole series
+        
+        Forecasts horizon steps from an origin every step observations,
+        training on everything before the origin (window=None) or on the
+        last window observations. Folds run in workers processes; with
+        reuse_params the first fold's parameters are reused by the others.
+        
+        Returns:
+            Per-fold metrics table and aggregate metrics
+        """
+        order = order or getattr(self, 'order', None)
+        if order is None:
+            print("No order available. Run train_model first or pass an order.")
+            return None, None
+        
+        folds, aggregate = rolling_backtest(self.data[VALUE_COLUMN], order, horizon, step,
+                                            initial, window, workers, reuse_params)
+        self.backtest_results = folds
+        
+        print(f"\nBacktest of ARIMA{order}: {aggregate['folds']} folds, "
+              f"horizon {horizon}, {'sliding' if window else 'expanding'} window")
+        for metric in ('MAE', 'RMSE', 'MAPE'):
+            print(f"{metric}: {aggregate[metric]:.4f}")
+        if aggregate['failed']:
+            print(f"Failed folds: {aggregate['failed']}")
+        
+        return folds, aggregate
+    
     def plot_validation(self, save_path=None):
         """Plot validation results"""
         if self.forecast is None:
@@ -0,0 +1,242 @@
+"""
+ARIMA order search helpers
+Fits candidate orders serially or in a process pool and selects the best by AIC,
+either over a full grid or stepwise (Hyndman-Khandakar)
+"""
+
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product, repeat
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tsa.stattools import adfuller, kpss
+
+from fit_cache import fit_cache
+
+
+Order = Tuple[int, int, int]
+
+UNIT_ROOT_TESTS = ('kpss', 'adf')
+
+
+def fit_order(series: pd.Series, order: Order):
+    """
+    Fit one ARIMA order, reusing a cached fit of the same data and order
+
+    Args:
+        series: Training series
+        order: (p, d, q)
+
+    Returns:
+        Fitted ARIMAResults
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return fit_cache.fit(ARIMA(series, order=order))
+
+
+def rebuild_fit(series: pd.Series, order: Order, params: np.ndarray):
+    """
+    Fitted results of an order from its estimated parameters
+
+    Runs one Kalman smoother pass instead of the optimizer, and stores the
+    parameters in the fit cache so a later fit of the same data and order
+    is a cache hit.
+
+    Args:
+        series: Training series the parameters were estimated on
+        order: (p, d, q)
+        params: Parameters returned by evaluate_order
+
+    Returns:
+        Fitted ARIMAResults
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model = ARIMA(series, order=order)
+        fit_cache.put(fit_cache.key(model), params)
+        return fit_cache.fit(model)
+
+
+def evaluate_order(series: pd.Series, order: Order) -> dict:
+    """
+    Fit one candidate order and time it
+
+    Module-level so that it can run in worker processes. Only the
+    parameters are returned, not the results object: a pickled result
+    holds the whole state space and would dominate the pool's traffic.
+    rebuild_fit turns the parameters of the winner back into results.
+
+    Returns:
+        Dict with 'order', 'aic', 'params', 'fit_time' and 'error'
+        ('params' is None and 'aic' is NaN when the fit failed)
+    """
+    start = time.perf_counter()
+    try:
+        result = fit_order(series, order)
+        aic, params, error = float(result.aic), np.asarray(result.params, dtype=np.float64), None
+    except Exception as e:
+        aic, params, error = np.nan, None, str(e)
+    return {
+        'order': tuple(order),
+        'aic': aic,
+        'params': params,
+        'fit_time': time.perf_counter() - start,
+        'error': error,
+    }
+
+
+def evaluate_orders(series: pd.Series, orders: Iterable[Order], workers: int = 1) -> List[dict]:
+    """
+    Fit several candidate orders
+
+    Every fit is independent, so with workers > 1 they run in a process
+    pool. The fits are the same in both modes, only their placement differs.
+
+    Args:
+        series: Training series
+        orders: Candidate (p, d, q) orders
+        workers: Number of worker processes (1 fits in this process)
+
+    Returns:
+        One evaluate_order dict per order, in the order given
+    """
+    orders = [tuple(order) for order in orders]
+    if workers <= 1 or len(orders) <= 1:
+        return [evaluate_order(series, order) for order in orders]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(orders))) as executor:
+        return list(executor.map(evaluate_order, repeat(series), orders))
+
+
+def select_best(candidates: Iterable[dict]) -> Optional[dict]:
+    """
+    Best fitted candidate: lowest AIC, ties broken by the smallest order
+
+    Returns:
+        Candidate dict or None if no candidate was fitted
+    """
+    fitted = [candidate for candidate in candidates
+              if candidate['params'] is not None and candidate['aic'] < np.inf]
+    if not fitted:
+        return None
+    return min(fitted, key=lambda candidate: (candidate['aic'], candidate['order']))
+
+
+def grid_orders(p_range: Iterable[int], d_range: Iterable[int], q_range: Iterable[int]) -> List[Order]:
+    """All (p, d, q) combinations of the ranges."""
+    return list(product(p_range, d_range, q_range))
+
+
+def search_table(candidates: Iterable[dict]) -> pd.DataFrame:
+    """Per-order AIC and fit time of a search, sorted like the selection."""
+    table = pd.DataFrame(
+        [(candidate['order'], candidate['aic'], candidate['fit_time'], candidate['error'])
+         for candidate in candidates],
+        columns=['order', 'aic', 'fit_time', 'error'])
+    return table.sort_values(['aic', 'order'], na_position='last').reset_index(drop=True)
+
+
+def choose_d(series: pd.Series, d_range: Iterable[int] = range(0, 3), test: str = 'kpss',
+             alpha: float = 0.05) -> int:
+    """
+    Number of differences needed to make a series stationary
+
+    The series is differenced until the unit-root test no longer calls for
+    it: KPSS rejecting stationarity, or ADF failing to reject a unit root.
+
+    Args:
+        series: Series to test
+        d_range: Allowed numbers of differences
+        test: 'kpss' or 'adf'
+        alpha: Significance level of the test
+
+    Returns:
+        Chosen d within d_range
+    """
+    if test not in UNIT_ROOT_TESTS:
+        raise ValueError(f"test must be one of {UNIT_ROOT_TESTS}, got {test!r}")
+
+    d_values = sorted(d_range)
+    values = np.asarray(series, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    for d in range(d_values[-1] + 1):
+        if d >= d_values[0]:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                if test == 'kpss':
+                    stationary = kpss(values, regression='c', nlags='auto')[1] >= alpha
+                else:
+                    stationary = adfuller(values, autolag='AIC')[1] < alpha
+            if stationary:
+                return d
+        values = np.diff(values)
+    return d_values[-1]
+
+
+def stepwise_neighbours(order: Order, p_range: Iterable[int], q_range: Iterable[int]) -> List[Order]:
+    """Orders one step away from order: p or q changed by 1, or both together."""
+    p, d, q = order
+    p_values, q_values = set(p_range), set(q_range)
+    steps = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1), (-1, 1), (1, -1)]
+    return [(p + dp, d, q + dq) for dp, dq in steps
+            if p + dp in p_values and q + dq in q_values]
+
+
+def stepwise_search(series: pd.Series, p_range: Iterable[int] = range(0, 6),
+                    d_range: Iterable[int] = range(0, 3), q_range: Iterable[int] = range(0, 6),
+                    test: str = 'kpss', workers: int = 1,
+                    max_rounds: int = 50) -> Tuple[Optional[dict], List[dict]]:
+    """
+    Stepwise order search after Hyndman and Khandakar (2008)
+
+    d is chosen by a unit-root test. Starting from ARIMA(2,d,2),
+    (0,d,0), (1,d,0) and (0,d,1), the neighbours of the best model so far
+    are fitted until none of them lowers the AIC. Each round of neighbours
+    is fitted with evaluate_orders, so it can use a process pool.
+
+    Args:
+        series: Training series
+        p_range: Allowed AR orders
+        d_range: Allowed numbers of differences
+        q_range: Allowed MA orders
+        test: Unit-root test choosing d ('kpss' or 'adf')
+        workers: Number of worker processes per round
+        max_rounds: Upper bound on the number of improvement rounds
+
+    Returns:
+        (best candidate or None, all evaluated candidates)
+    """
+    p_range, q_range = list(p_range), list(q_range)
+    d = choose_d(series, d_range, test)
+
+    starts = [(2, d, 2), (0, d, 0), (1, d, 0), (0, d, 1)]
+    starts = [order for order in starts if order[0] in p_range and order[2] in q_range]
+    if not starts:
+        starts = [(min(p_range), d, min(q_range))]
+
+    candidates = evaluate_orders(series, starts, workers)
+    visited = {candidate['order'] for candidate in candidates}
+    best = select_best(candidates)
+
+    for _ in range(max_rounds):
+        if best is None:
+            break
+        neighbours = [order for order in stepwise_neighbours(best['order'], p_range, q_range)
+                      if order not in visited]
+        if not neighbours:
+            break
+        round_candidates = evaluate_orders(series, neighbours, workers)
+        candidates.extend(round_candidates)
+        visited.update(neighbours)
+
+        round_best = select_best(round_candidates)
+        if round_best is None or round_best['aic'] >= best['aic']:
+            break
+        best = round_best
+
+    return best, candidates
@@ -0,0 +1,142 @@
+"""
+Rolling-origin backtesting of ARIMA models
+Refits (or refilters) the model at many forecast origins and scores every
+multi-step forecast, optionally across worker processes
+"""
+
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+
+from arima_search import Order, fit_order
+
+
+METRICS = ('MAE', 'RMSE', 'MAPE')
+
+
+def rolling_origins(n_obs: int, initial: int, horizon: int, step: int) -> List[int]:
+    """
+    Forecast origins of a rolling backtest
+
+    Args:
+        n_obs: Length of the series
+        initial: Observations before the first origin
+        horizon: Steps forecast from each origin
+        step: Observations between two origins
+
+    Returns:
+        Positions of the first forecast step of every fold
+    """
+    if initial < 1 or horizon < 1 or step < 1:
+        raise ValueError("initial, horizon and step must be positive")
+    return list(range(initial, n_obs - horizon + 1, step))
+
+
+def forecast_metrics(actual: np.ndarray, forecast: np.ndarray) -> dict:
+    """MAE, RMSE and MAPE (in percent) of a forecast."""
+    errors = actual - forecast
+    return {
+        'MAE': float(np.mean(np.abs(errors))),
+        'RMSE': float(np.sqrt(np.mean(errors ** 2))),
+        'MAPE': float(np.mean(np.abs(errors / actual)) * 100),
+    }
+
+
+def run_fold(values: np.ndarray, order: Order, origin: int, horizon: int,
+             window: Optional[int] = None, params: Optional[np.ndarray] = None) -> dict:
+    """
+    Fit on the data before an origin and score the forecast after it
+
+    Module-level so that it can run in worker processes.
+
+    Args:
+        values: Whole series
+        order: ARIMA (p, d, q)
+        origin: Position of the first forecast step
+        horizon: Steps to forecast
+        window: Training length of a sliding window (None for an expanding window)
+        params: Parameters to reuse instead of fitting (only the filter runs)
+
+    Returns:
+        Dict with the fold bounds, the metrics, the fit time and the error, if any
+    """
+    start = 0 if window is None else max(0, origin - window)
+    train = values[start:origin]
+    actual = values[origin:origin + horizon]
+    fold = {'origin': origin, 'train_start': start, 'train_size': len(train)}
+
+    began = time.perf_counter()
+    try:
+        if params is None:
+            results = fit_order(train, order)
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                results = ARIMA(train, order=order).smooth(params)
+        forecast = np.asarray(results.forecast(steps=horizon))
+        fold.update(forecast_metrics(actual, forecast))
+        fold['error'] = None
+    except Exception as e:
+        fold.update({metric: np.nan for metric in METRICS})
+        fold['error'] = str(e)
+    fold['fit_time'] = time.perf_counter() - began
+    return fold
+
+
+def rolling_backtest(series: pd.Series, order: Order, horizon: int = 5, step: int = 20,
+                     initial: Optional[int] = None, window: Optional[int] = None,
+                     workers: int = 1, reuse_params: bool = False) -> Tuple[pd.DataFrame, dict]:
+    """
+    Rolling-origin evaluation of an ARIMA order
+
+    Args:
+        series: Series to evaluate on
+        order: ARIMA (p, d, q)
+        horizon: Steps forecast from each origin
+        step: Observations between two origins
+        initial: Observations before the first origin (defaults to the window
+                 size, or to half of the series for an expanding window)
+        window: Training length of a sliding window (None for an expanding window)
+        workers: Number of worker processes (1 runs the folds in this process)
+        reuse_params: Fit once on the first training window and only filter
+                      the later folds with those parameters
+
+    Returns:
+        (per-fold table, aggregate metrics averaged over the successful folds)
+    """
+    values = np.asarray(series, dtype=np.float64)
+    if initial is None:
+        initial = window if window is not None else len(values) // 2
+    origins = rolling_origins(len(values), initial, horizon, step)
+    if not origins:
+        raise ValueError("The series is too short for this backtest")
+
+    params = None
+    if reuse_params:
+        first_start = 0 if window is None else max(0, origins[0] - window)
+        params = np.asarray(fit_order(values[first_start:origins[0]], order).params)
+
+    arguments = (repeat(values), repeat(order), origins, repeat(horizon),
+                 repeat(window), repeat(params))
+    if workers <= 1:
+        folds = list(map(run_fold, *arguments))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(origins) // (workers * 4))
+            folds = list(executor.map(run_fold, *arguments, chunksize=chunksize))
+
+    table = pd.DataFrame(folds)
+    if isinstance(series, pd.Series):
+        table.insert(1, 'origin_date', series.index[table['origin']])
+
+    succeeded = table[table['error'].isna()]
+    aggregate = {metric: float(succeeded[metric].mean()) for metric in METRICS}
+    aggregate['folds'] = len(table)
+    aggregate['failed'] = len(table) - len(succeeded)
+    return table, aggregate
@@ -13,4 +13,7 @@ TEST_SIZE = 0.2  # 20% for testing
 RANDOM_STATE = 42
 
 # Model parameters
-FORECAST_STEPS = 30
\ No newline at end of file
+FORECAST_STEPS = 30
+
+# Fitted ARIMA/SARIMA parameters reused between runs (created on first fit)
+MODEL_CACHE_DIR = 'model_cache'
\ No newline at end of file
@@ -2,164 +2,890 @@
 Laboratory work: Automatic data collection. Web-scraping.
 """
 
+import argparse
+import asyncio
 import requests
 import csv
 import datetime
-from time import sleep
-import random
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+
+from rate_limiter import AdaptiveRateLimiter
+from response_cache import ResponseCache
+from publication_calendar import PublicationCalendar
+from dataset_writer import StreamingCSVWriter, read_last_row
+from scrape_journal import ScrapeJournal, STATUS_OK, STATUS_MISSING, STATUS_ABSENT, STATUS_FAILED
 
 
 class CurrencyScraper:
     """Class for currency data collection."""
     
-    def __init__(self):
-        self.base_url = "https://www.cbr-xml-daily.ru/archive"
+    def __init__(self, base_url="https://www.cbr-xml-daily.ru/archive", max_concurrency=16,
+                 pool_size=None, requests_per_second=10.0, rate_limiter=None,
+                 currencies=('USD',), layout='wide', cache_dir="http_cache",
+                 calendar_file="publication_calendar.json", journal_file="scrape.journal"):
+        self.base_url = base_url
         # Increase timeout for slow requests
         self.timeout = 30
         # Max retries for one day
         self.max_retries = 3
+        # Delay before the second attempt at a day, doubled for every next one
+        self.retry_backoff = 1.0
+        # Max requests in flight for the concurrent mode
+        self.max_concurrency = max_concurrency
+        # Keep-alive connections kept open per host
+        self.pool_size = pool_size or max_concurrency
+        self.session = self._create_session()
+        # Token bucket pacing every request; pass one in to share it
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(requests_per_second)
+        # Currency codes extracted from every daily file, or 'all'
+        self.currencies = currencies if currencies == 'all' else [code.upper() for code in currencies]
+        # 'wide' (one column per currency) or 'long' (date, currency, rate);
+        # the set of codes changes over the decades, so 'all' is always long
+        self.layout = 'long' if currencies == 'all' else layout
+        # On-disk response cache, disabled with cache_dir=None
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        # Non-publication days learned from earlier 404s
+        self.calendar = PublicationCalendar(calendar_file)
+        # Checkpoint journal of scrape_data, disabled with journal_file=None
+        self.journal_file = journal_file
+        # Prefix of progress lines, set per shard by scrape_sharded
+        self.progress_label = ""
+    
+    def _create_session(self):
+        """Create a keep-alive session with a connection pool of pool_size."""
+        session = requests.Session()
+        # Retries are handled by get_currency_rate, not by the adapter
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        # requests decompresses gzip/deflate bodies transparently
+        session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+        return session
+    
+    def connection_stats(self):
+        """
+        Report how many connections the session opened and how many
+        requests reused an already open connection.
+        """
+        opened = 0
+        requests_sent = 0
+        # The same adapter is mounted for http and https
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                opened += pool.num_connections
+                requests_sent += pool.num_requests
+        return {
+            'requests': requests_sent,
+            'opened': opened,
+            'reused': requests_sent - opened,
+        }
+    
+    def close(self):
+        """Close the pooled connections."""
+        self.session.close()
+    
+    def _build_url(self, date):
+        """Build the archive URL of the daily JSON file for a date."""
+        return f"{self.base_url}/{date.strftime('%Y/%m/%d')}/daily_json.js"
+    
+    def _cached_response(self, url, date):
+        """
+        Serve a past day straight from the response cache.
+        
+        Archive files of past days never change, so they need no request.
+        """
+        if self.cache is None or date >= datetime.date.today():
+            return None
+        entry = self.cache.get(url)
+        if entry is None:
+            return None
+        return self.cache.to_response(url, *entry)
+    
+    def _request(self, url, date):
+        """
+        Send a GET through the pooled session and keep the response in the cache.
+        
+        A cached copy of today's (or a future) file is revalidated with
+        ETag and If-Modified-Since; a 304 answer is served from disk.
+        """
+        entry = None
+        if self.cache and date >= datetime.date.today():
+            entry = self.cache.get(url)
+        headers = self.cache.validators(entry[0]) if entry else None
+        response = self.session.get(url, timeout=self.timeout, headers=headers)
+        
+        if response.status_code == 304 and entry:
+            self.rate_limiter.on_success()
+            return self.cache.revalidate(url, *entry)
+        if response.status_code == 200 and self.cache:
+            self.cache.put(url, response)
+        return response
+    
+    def _parse_response(self, response, date, attempt):
+        """
+        Interpret one archive response.
+        
+        Returns a (status, result) pair: status is None when the request
+        should be retried.
+        """
+        date_str = date.strftime("%Y/%m/%d")
+        if getattr(response, 'from_cache', False):
+            pass
+        elif response.status_code == 429 or response.status_code >= 500:
+            self.rate_limiter.on_throttle(self._retry_after(response))
+        elif response.status_code in (200, 404):
+            self.rate_limiter.on_success()
+        
+        if response.status_code == 200:
+            rates = self._extract_rates(response.json())
+            if not rates:
+                print(f"No rates for {date_str} in the requested currencies")
+                return STATUS_ABSENT, None
+            print(f"Successfully received rates for {date_str}: "
+                  + ", ".join(f"{code} {value}" for code, value in rates.items()))
+            return STATUS_OK, (date.strftime("%Y-%m-%d"), rates)
+        # If the page is not found (404) - there is no data > won't try again
+        if response.status_code == 404:
+            print(f"No data for {date_str} (404)")
+            return STATUS_MISSING, None
+        print(f"Error {response.status_code} for {date_str}, attempt {attempt + 1}")
+        return None, None
+    
+    def _retry_delay(self, attempt, retry_after=None, connection_error=False):
+        """
+        Seconds to wait before the next attempt at one day.
+        
+        The rate limiter only paces the whole request stream, so a day also
+        backs off exponentially (1, 2, 4... s), 2 s longer after a connection
+        error, and is never retried before its Retry-After delay.
+        """
+        delay = self.retry_backoff * 2 ** attempt
+        if connection_error:
+            delay += 2
+        return max(delay, retry_after or 0.0)
+    
+    def _retry_after(self, response):
+        """Seconds requested by a Retry-After header, if it is numeric."""
+        try:
+            return float(response.headers.get('Retry-After', ''))
+        except ValueError:
+            return None
+    
+    def _extract_rates(self, data):
+        """Pick the configured currencies out of one daily JSON payload."""
+        valute = data['Valute']
+        if self.currencies == 'all':
+            return {code: item['Value'] for code, item in valute.items()}
+        return {code: valute[code]['Value'] for code in self.currencies if code in valute}
     
     def get_currency_rate(self, date):
-        """Get the dollar exchange rate for a specific date with repetitive attempts."""
+        """
+        Get the exchange rate of the first configured currency (the dollar
+        by default) for a specific date with repetitive attempts.
+        """
+        result = self.fetch_rates(date)[1]
+        code = 'USD' if self.currencies == 'all' else self.currencies[0]
+        if result and code in result[1]:
+            return (result[0], result[1][code])
+        return None
+    
+    def fetch_rates(self, date):
+        """
+        Fetch one day and extract every configured currency from it.
+        
+        Returns:
+            (status, result) where status is 'ok', 'missing' (404) or
+            'failed' (all attempts exhausted), and result is a
+            (date, {currency: rate}) record or None
+        """
         date_str = date.strftime("%Y/%m/%d")
-        url = f"{self.base_url}/{date_str}/daily_json.js"
+        url = self._build_url(date)
         
-        # Several tries with exponential backoff
+        # Several tries with exponential backoff, paced by the rate limiter
+        # which also slows the other days down on errors
         for attempt in range(self.max_retries):
+            retry_after, connection_error = None, False
             try:
-                # Random delay between 0.05 and 0.15 seconds
-                sleep(0.05 + random.uniform(0, 0.1))
-                
-                # Increase the timeout for each request
-                response = requests.get(url, timeout=self.timeout)
+                response = self._cached_response(url, date)
+                if response is None:
+                    self.rate_limiter.acquire()
+                    response = self._request(url, date)
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    usd_rate = data['Valute']['USD']['Value']
-                    print(f"Successfully received rate for {date_str}: {usd_rate}")
-                    return (date.strftime("%Y-%m-%d"), usd_rate)
-                else:
-                    # If the page is not found (404) - there is no data > won't try again
-                    if response.status_code == 404:
-                        print(f"No data for {date_str} (404)")
-                        return None
-                    else:
-                        print(f"Error {response.status_code} for {date_str}, attempt {attempt + 1}")
+                status, result = self._parse_response(response, date, attempt)
+                if status:
+                    return status, result
+                retry_after = self._retry_after(response)
                         
             except requests.exceptions.Timeout:
                 print(f"Timeput for {date_str}, attempt {attempt + 1}")
+                self.rate_limiter.on_throttle()
             except requests.exceptions.ConnectionError:
                 print(f"Connection error for {date_str}, attempt{attempt + 1}")
-                # Wait longer if there're connection problems.
-                sleep(2)
+                self.rate_limiter.on_throttle()
+                connection_error = True
             except Exception as e:
                 print(f"Error for {date_str}: {e}, attempt {attempt + 1}")
             
-            # Increase the delay before the next attempt
             if attempt < self.max_retries - 1:
-                sleep(2 ** attempt)  # Exponential delay: 1, 2, 4 seconds
+                time.sleep(self._retry_delay(attempt, retry_after, connection_error))
         
         print(f"Couldn't get data for' {date_str} after {self.max_retries} attempts")
-        return None
+        return STATUS_FAILED, None
     
-    def scrape_data(self, start_year=1997):
-        """The main method of data collection."""
-        print("Data collection begins...")
+    def scrape_data(self, start_year=1997, end_date=None, concurrent=False, journal=None,
+                    verify=False):
+        """
+        The main method of data collection.
         
+        With concurrent=True the days are fetched by scrape_data_async.
+        Each fetched day is also recorded in journal when one is given.
+        Otherwise the days are checkpointed in journal_file: a run that
+        was interrupted resumes from it, and it is removed once the rows
+        are returned. Days the publication calendar knows to be empty are
+        skipped unless verify=True re-probes them.
+        """
         start_date = datetime.date(start_year, 1, 1)
-        end_date = datetime.date.today()
-        current_date = start_date
+        end_date = end_date or datetime.date.today()
+        dates = self._date_range(start_date, end_date)
+        if journal is not None or not self.journal_file:
+            return self.scrape_dates(dates, concurrent, journal, verify)
+        
         results = []
+        journal = ScrapeJournal(self.journal_file, config=self._journal_config())
+        self._collect_journaled(dates, concurrent, verify, journal, results.append)
+        journal.remove()
+        return self.to_rows(results)
+    
+    def _date_range(self, start_date, end_date):
+        """All calendar days from start_date to end_date inclusive."""
+        total_days = (end_date - start_date).days + 1
+        return [start_date + datetime.timedelta(days=i) for i in range(total_days)]
+    
+    def _plan_dates(self, dates, verify):
+        """Drop the days known to have no archive file, unless verifying them."""
+        if verify:
+            return dates
+        planned = self.calendar.filter_dates(dates)
+        if len(planned) < len(dates):
+            print(f"Skipping {len(dates) - len(planned)} known non-publication days")
+        return planned
+    
+    def _record_outcome(self, date, status, result, journal):
+        """Feed the outcome of one day to the journal and the publication calendar."""
+        if journal is not None:
+            journal.record(date.strftime("%Y-%m-%d"), status, result[1] if result else None)
+        self.calendar.record(date, status)
+    
+    def _journal_config(self):
+        """
+        Configuration the journal records depend on: a journal written for
+        other currencies or another layout is not resumed.
+        """
+        currencies = 'all' if self.currencies == 'all' else ' '.join(self.currencies)
+        return f"currencies={currencies};layout={self.layout}"
+    
+    def _settled_dates(self, replayed):
+        """
+        Dates of replayed journal records that need no new request: days
+        with rates for every configured currency, and days without a file.
+        """
+        settled = set()
+        for date, (status, rates) in replayed.items():
+            if status == STATUS_MISSING:
+                settled.add(date)
+            elif status == STATUS_OK and (self.currencies == 'all'
+                                          or all(code in rates for code in self.currencies)):
+                settled.add(date)
+        return settled
+    
+    def _collect_journaled(self, dates, concurrent, verify, journal, on_record):
+        """
+        _collect resuming from a journal: the days it already settles are
+        not fetched again, and their records are handed to on_record in
+        date order together with the fetched ones.
+        """
+        replayed = journal.replay()
+        if replayed:
+            print(f"Replaying {len(replayed)} journal records")
+        wanted = {date.strftime("%Y-%m-%d") for date in dates}
+        settled = self._settled_dates(replayed) & wanted
+        # The journal holds repr() of the rates, which converts back exactly
+        stored = iter(sorted(
+            (date, {code: float(value) for code, value in replayed[date][1].items()})
+            for date in settled if replayed[date][0] == STATUS_OK))
+        next_stored = next(stored, None)
+        
+        def emit(record):
+            nonlocal next_stored
+            # ISO dates compare chronologically as strings
+            while next_stored is not None and next_stored[0] < record[0]:
+                on_record(next_stored)
+                next_stored = next(stored, None)
+            on_record(record)
+        
+        try:
+            self._collect([date for date in dates if date.strftime("%Y-%m-%d") not in settled],
+                          concurrent, journal, verify, emit)
+        finally:
+            journal.close()
+        
+        while next_stored is not None:
+            on_record(next_stored)
+            next_stored = next(stored, None)
+    
+    def scrape_dates(self, dates, concurrent=False, journal=None, verify=False):
+        """
+        Collect data for the given dates and return the rows in date order.
+        
+        The rows follow csv_header: (date, rate) pairs for the default
+        single-currency configuration.
+        """
+        results = []
+        self._collect(dates, concurrent, journal, verify, results.append)
+        return self.to_rows(results)
+    
+    def _collect(self, dates, concurrent, journal, verify, on_record):
+        """Fetch the dates and hand every (date, rates) record to on_record in date order."""
+        if concurrent:
+            return asyncio.run(self._collect_async(dates, journal, verify, on_record))
+        
+        print("Data collection begins...")
+        
+        success = 0
         errors = 0
         
-        total_days = (end_date - start_date).days + 1
+        dates = self._plan_dates(dates, verify)
+        total_days = len(dates)
         print(f"Total days to process: {total_days}")
         
-        while current_date <= end_date:
-            # Skip weekends (no data usually)
-            # if current_date.weekday() >= 5:  # 5 � 6 - saturday and sunday
-            #     current_date += datetime.timedelta(days=1)
-            #     continue
+        try:
+            for processed_days, current_date in enumerate(dates, 1):
+                status, result = self.fetch_rates(current_date)
+                self._record_outcome(current_date, status, result, journal)
+                if result:
+                    on_record(result)
+                    success += 1
+                else:
+                    errors += 1
+                
+                # Progress every 100 days
+                if processed_days % 100 == 0:
+                    success_rate = (success / processed_days) * 100
+                    print(f"{self.progress_label}Processed: {processed_days}/{total_days} days, "
+                          f"success: {success}, errors: {errors}, "
+                          f"success rate: {success_rate:.1f}%")
+        finally:
+            self.calendar.save()
+        
+        self._print_summary(success, errors)
+        return success
+    
+    def _print_summary(self, success, errors):
+        """Print the outcome of a run with the connection, limiter and cache counters."""
+        print(f"Data collection end. Success: {success} entries, Errors: {errors}")
+        print(f"Connections: {self.connection_stats()}")
+        print(f"Rate limiter: {self.rate_limiter.stats()}")
+        if self.cache:
+            print(f"Response cache: {self.cache.stats()}")
+    
+    async def _fetch_rates_async(self, loop, executor, semaphore, date):
+        """Asynchronous counterpart of fetch_rates with the same 404/retry rules."""
+        date_str = date.strftime("%Y/%m/%d")
+        url = self._build_url(date)
+        
+        for attempt in range(self.max_retries):
+            retry_after, connection_error = None, False
+            try:
+                # Cache reads and requests are blocking, so they run in the worker pool
+                response = await loop.run_in_executor(
+                    executor, self._cached_response, url, date)
+                if response is None:
+                    async with semaphore:
+                        await self.rate_limiter.acquire_async()
+                        response = await loop.run_in_executor(executor, self._request, url, date)
+                
+                status, result = self._parse_response(response, date, attempt)
+                if status:
+                    return status, result
+                retry_after = self._retry_after(response)
             
-            result = self.get_currency_rate(current_date)
+            except requests.exceptions.Timeout:
+                print(f"Timeput for {date_str}, attempt {attempt + 1}")
+                self.rate_limiter.on_throttle()
+            except requests.exceptions.ConnectionError:
+                print(f"Connection error for {date_str}, attempt{attempt + 1}")
+                self.rate_limiter.on_throttle()
+                connection_error = True
+            except Exception as e:
+                print(f"Error for {date_str}: {e}, attempt {attempt + 1}")
+            
+            # Only this day waits; the semaphore slot is already released
+            if attempt < self.max_retries - 1:
+                await asyncio.sleep(self._retry_delay(attempt, retry_after, connection_error))
+        
+        print(f"Couldn't get data for' {date_str} after {self.max_retries} attempts")
+        return STATUS_FAILED, None
+    
+    async def scrape_data_async(self, start_year=1997, end_date=None, verify=False):
+        """Asynchronous counterpart of scrape_data."""
+        start_date = datetime.date(start_year, 1, 1)
+        end_date = end_date or datetime.date.today()
+        return await self.scrape_dates_async(self._date_range(start_date, end_date), verify=verify)
+    
+    async def scrape_dates_async(self, dates, journal=None, verify=False):
+        """
+        Collect data with up to max_concurrency requests in flight.
+        
+        All requests share the scraper session, so pool_size should be
+        at least max_concurrency. Results are returned in date order,
+        the same as scrape_dates.
+        """
+        results = []
+        await self._collect_async(dates, journal, verify, results.append)
+        return self.to_rows(results)
+    
+    async def _collect_async(self, dates, journal, verify, on_record):
+        """Asynchronous counterpart of _collect."""
+        print("Concurrent data collection begins...")
+        
+        dates = self._plan_dates(dates, verify)
+        total_days = len(dates)
+        print(f"Total days to process: {total_days}")
+        
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        progress = {'done': 0, 'success': 0, 'next': 0}
+        # Days finished ahead of an earlier, still running day
+        finished = {}
+        
+        async def fetch(index, date):
+            status, result = await self._fetch_rates_async(loop, executor, semaphore, date)
+            # Outcomes are recorded from the event loop thread only
+            self._record_outcome(date, status, result, journal)
+            progress['done'] += 1
             if result:
-                results.append(result)
-            else:
-                errors += 1
+                progress['success'] += 1
+            if progress['done'] % 100 == 0:
+                print(f"{self.progress_label}Processed: {progress['done']}/{total_days} days, "
+                      f"success: {progress['success']}")
             
-            # Progress every 100 days
-            processed_days = (current_date - start_date).days + 1
-            if processed_days % 100 == 0:
-                success_rate = (len(results) / processed_days) * 100
-                print(f"Processed: {processed_days}/{total_days} days, "
-                      f"success: {len(results)}, errors: {errors}, "
-                      f"success rate: {success_rate:.1f}%")
+            # Release records in date order as soon as their predecessors are done
+            finished[index] = result
+            while progress['next'] in finished:
+                ready = finished.pop(progress['next'])
+                progress['next'] += 1
+                if ready:
+                    on_record(ready)
+        
+        try:
+            await asyncio.gather(*(fetch(index, date) for index, date in enumerate(dates)))
+        finally:
+            executor.shutdown(wait=True)
+            self.calendar.save()
+        
+        self._print_summary(progress['success'], total_days - progress['success'])
+        return progress['success']
+    
+    def scrape_to_csv(self, filename="dataset.csv", start_year=1997, end_date=None,
+                      concurrent=False, verify=False, start_date=None, compact=True):
+        """
+        Collect data and stream the rows into a CSV file as they are produced.
+        
+        Rows go to '<filename>.part' and the file is renamed over filename
+        once the run completes, so memory use stays flat for long runs.
+        A run that collects nothing leaves the existing file untouched.
+        start_date, when given, overrides start_year.
+        
+        Every fetched day is checkpointed in '<filename>.journal'. An
+        interrupted run replays it and only fetches the remaining days;
+        the journal is removed once the file is written, unless compact
+        is False.
+        
+        Returns:
+            Number of rows written
+        """
+        start_date = start_date or datetime.date(start_year, 1, 1)
+        end_date = end_date or datetime.date.today()
+        dates = self._date_range(start_date, end_date)
+        journal = ScrapeJournal(f"{filename}.journal", config=self._journal_config())
+        
+        writer = StreamingCSVWriter(filename, self.csv_header())
+        try:
+            self._collect_journaled(dates, concurrent, verify, journal,
+                                    lambda record: writer.write_rows(self.to_rows([record])))
+        except BaseException:
+            writer.abort()
+            raise
+        
+        if not writer.rows_written:
+            writer.abort()
+        else:
+            writer.commit()
+            print(f"Data saved to {filename}")
+        if compact:
+            journal.remove()
+        return writer.rows_written
+    
+    def _worker_config(self, workers):
+        """Constructor arguments of a shard scraper with its share of the rate budget."""
+        return {
+            'base_url': self.base_url,
+            'max_concurrency': self.max_concurrency,
+            'pool_size': self.pool_size,
+            'requests_per_second': self.rate_limiter.max_rate / workers,
+            'currencies': self.currencies,
+            'layout': self.layout,
+            'cache_dir': self.cache.cache_dir if self.cache else None,
+            # Shards report what they learn; only this scraper saves the calendar
+            'calendar_file': None,
+        }
+    
+    def scrape_sharded(self, filename="dataset.csv", start_date=None, end_date=None,
+                       workers=4, executor='process', concurrent=False, verify=False):
+        """
+        Split a date range into shards and scrape them in a worker pool.
+        
+        Every worker runs its own scraper, with its own session and an
+        equal share of this scraper's request rate. Shards are written to
+        '<filename>.shardN' files and concatenated in date order into
+        filename once all of them are done. Their journals are kept until
+        then, so a rerun over the same range and workers resumes.
+        A run that collects nothing, or whose shards fail, leaves the
+        existing file untouched.
+        
+        Args:
+            filename: Output CSV file
+            start_date: First date (1997-01-01 by default)
+            end_date: Last date (today by default)
+            workers: Number of shards and worker processes/threads
+            executor: 'process' or 'thread'
+            concurrent: Use the asyncio mode inside every worker
+            verify: Re-probe days the publication calendar marks as empty
             
-            current_date += datetime.timedelta(days=1)
+        Returns:
+            Number of rows written
+        """
+        start_date = start_date or datetime.date(1997, 1, 1)
+        end_date = end_date or datetime.date.today()
+        shards = split_date_range(start_date, end_date, workers)
+        config = self._worker_config(len(shards))
+        calendar_state = (sorted(self.calendar.published), sorted(self.calendar.gaps))
+        shard_files = [f"{filename}.shard{index}" for index in range(len(shards))]
+        total_rows = 0
+        
+        print(f"Scraping {start_date} - {end_date} in {len(shards)} shards")
+        pool_class = ProcessPoolExecutor if executor == 'process' else ThreadPoolExecutor
+        try:
+            with pool_class(max_workers=len(shards)) as pool:
+                futures = [
+                    pool.submit(_scrape_shard, index, config, calendar_state, shard_start, shard_end,
+                                shard_files[index], concurrent, verify)
+                    for index, (shard_start, shard_end) in enumerate(shards)
+                ]
+                for done, future in enumerate(as_completed(futures), 1):
+                    index, rows, published, gaps = future.result()
+                    total_rows += rows
+                    self.calendar.published.update(published)
+                    self.calendar.gaps.update(gaps)
+                    shard_start, shard_end = shards[index]
+                    print(f"Shard {index + 1}/{len(shards)} ({shard_start} - {shard_end}) "
+                          f"finished with {rows} rows [{done}/{len(shards)} done]")
+        except BaseException:
+            # The pool has waited for the other shards; their journals stay for a rerun
+            self._remove_shard_files(shard_files)
+            raise
+        self.calendar.gaps -= self.calendar.published
+        self.calendar.save()
         
-        print(f"Data collection end. Success: {len(results)} entries, Errors: {errors}")
-        return results
+        if not total_rows:
+            self._remove_shard_files(shard_files, journals=True)
+            print(f"No data collected, {filename} left unchanged")
+            return 0
+        
+        # Shards cover consecutive ranges, so concatenating them keeps date order
+        with StreamingCSVWriter(filename, self.csv_header()) as writer:
+            for shard_file in shard_files:
+                if not os.path.exists(shard_file):
+                    continue
+                with open(shard_file, 'r', newline='', encoding='utf-8') as file:
+                    reader = csv.reader(file)
+                    next(reader, None)  # Skip title
+                    writer.write_rows(reader)
+        self._remove_shard_files(shard_files, journals=True)
+        print(f"Data saved to {filename}")
+        return writer.rows_written
+    
+    def _remove_shard_files(self, shard_files, journals=False):
+        """Delete the shard outputs of scrape_sharded and, optionally, their journals."""
+        for shard_file in shard_files:
+            if os.path.exists(shard_file):
+                os.remove(shard_file)
+            if journals:
+                ScrapeJournal(f"{shard_file}.journal").remove()
     
     def save_to_csv(self, data, filename="dataset.csv"):
-        """Save data to a CSV-file."""
+        """
+        Save data to a CSV-file.
+        
+        The rows are written to a temporary file that then replaces the
+        target, so a crash never leaves a half-written dataset.
+        """
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(['date', 'rate'])
-                writer.writerows(data)
+            with StreamingCSVWriter(filename, self.csv_header()) as writer:
+                writer.write_rows(data)
             print(f"Data saved to {filename}")
             return True
         except Exception as e:
             print(f"Saving error: {e}")
             return False
     
-    def resume_from_date(self, last_successful_date, filename="dataset.csv"):
-        """Continue collecting data from a specific date."""
+    def csv_header(self):
+        """Column names of the dataset for the configured currencies and layout."""
+        if self.layout == 'long':
+            return ['date', 'currency', 'rate']
+        if len(self.currencies) == 1:
+            # Single-currency datasets keep the historical date,rate layout
+            return ['date', 'rate']
+        return ['date'] + list(self.currencies)
+    
+    def to_rows(self, records):
+        """Convert (date, {currency: rate}) records into rows matching csv_header."""
+        if self.layout == 'long':
+            return [(date, code, rates[code]) for date, rates in records for code in sorted(rates)]
+        if len(self.currencies) == 1:
+            code = self.currencies[0]
+            return [(date, rates[code]) for date, rates in records if code in rates]
+        return [(date, *[rates.get(code, '') for code in self.currencies]) for date, rates in records]
+    
+    def _iter_dataset(self, filename):
+        """Stream (date, {currency: rate}) records from a dataset in any layout."""
         try:
-            # Read existing data
-            with open(filename, 'r', encoding='utf-8') as file:
-                reader = csv.reader(file)
-                existing_data = list(reader)[1:]  # Skip title
+            file = open(filename, 'r', newline='', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        
+        with file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return
+            single_code = 'USD' if self.currencies == 'all' else self.currencies[0]
             
-            # Get the latest date from a file
-            if existing_data:
-                last_date = existing_data[-1][0]
-                print(f"Continue collecting data from: {last_date}")
+            date, rates = None, {}
+            for row in reader:
+                if not row:
+                    continue
+                # Long datasets hold one row per currency, grouped by date
+                if row[0] != date:
+                    if date is not None:
+                        yield date, rates
+                    date, rates = row[0], {}
+                if header == ['date', 'currency', 'rate']:
+                    rates[row[1]] = row[2]
+                elif header == ['date', 'rate']:
+                    rates[single_code] = row[1]
+                else:
+                    rates.update((code, value) for code, value in zip(header[1:], row[1:]) if value)
+            if date is not None:
+                yield date, rates
+    
+    def _read_dates(self, filename):
+        """Index the dates stored in a dataset, reading only its first column."""
+        try:
+            with open(filename, 'r', newline='', encoding='utf-8') as file:
+                reader = csv.reader(file)
+                next(reader, None)  # Skip title
+                return {row[0] for row in reader if row}
+        except FileNotFoundError:
+            return set()
+    
+    def _merge_into_dataset(self, filename, new_records):
+        """
+        Stream the stored rows and the sorted new records into a new dataset.
+        
+        On a date present in both the stored row wins.
+        
+        Returns:
+            Number of records added
+        """
+        added = 0
+        new_records = iter(new_records)
+        pending = next(new_records, None)
+        
+        with StreamingCSVWriter(filename, self.csv_header()) as writer:
+            for date, rates in self._iter_dataset(filename):
+                # ISO dates compare chronologically as strings
+                while pending is not None and pending[0] < date:
+                    writer.write_rows(self.to_rows([pending]))
+                    added += 1
+                    pending = next(new_records, None)
+                if pending is not None and pending[0] == date:
+                    pending = next(new_records, None)
+                writer.write_rows(self.to_rows([(date, rates)]))
             
-            # �ollect data from the last successful date
+            while pending is not None:
+                writer.write_rows(self.to_rows([pending]))
+                added += 1
+                pending = next(new_records, None)
+        return added
+    
+    def missing_dates(self, known_dates, start_date, end_date=None, verify=False):
+        """
+        Expected publication days between start_date and end_date that
+        are not in known_dates (a set of 'YYYY-MM-DD' strings).
+        """
+        end_date = end_date or datetime.date.today()
+        return [
+            date for date in self._date_range(start_date, end_date)
+            if (verify or not self.calendar.is_known_gap(date))
+            and date.strftime("%Y-%m-%d") not in known_dates
+        ]
+    
+    def update_dataset(self, filename="dataset.csv", start_date=None, concurrent=False,
+                       verify=False):
+        """
+        Fetch only the publication days missing from a dataset and merge them in.
+        
+        Without start_date the scan starts the day after the last stored
+        date. Every fetched day is checkpointed in '<filename>.journal';
+        an interrupted run replays that journal and skips the days it
+        already covers. When the run finishes the journal is compacted
+        into the dataset, written in date order without duplicates.
+        
+        Returns:
+            Number of new rows added
+        """
+        if start_date is None:
+            # The dataset is sorted, so everything after its last row is missing
+            last_row = read_last_row(filename)
+            if last_row:
+                last_date = datetime.datetime.strptime(last_row[0], "%Y-%m-%d").date()
+                start_date = last_date + datetime.timedelta(days=1)
+            else:
+                start_date = datetime.date(1997, 1, 1)
+            existing = set()
+        else:
+            existing = self._read_dates(filename)
+            # Stored days are known publication days, whatever their weekday
+            self.calendar.learn_published(existing)
+        
+        journal = ScrapeJournal(f"{filename}.journal", config=self._journal_config())
+        replayed = journal.replay()
+        if replayed:
+            print(f"Replaying {len(replayed)} journal records")
+        # Failed days are retried, everything else is already known
+        known = set(existing) | self._settled_dates(replayed)
+        
+        dates = self.missing_dates(known, start_date, verify=verify)
+        print(f"Dates to fetch since {start_date}: {len(dates)}")
+        try:
+            self.scrape_dates(dates, concurrent, journal, verify)
+        finally:
+            journal.close()
+        
+        new_records = sorted(
+            (date, rates) for date, (status, rates) in journal.replay().items()
+            if status == STATUS_OK and date not in existing
+        )
+        added = self._merge_into_dataset(filename, new_records) if new_records else 0
+        journal.remove()
+        print(f"Data saved to {filename}")
+        return added
+    
+    def resume_from_date(self, last_successful_date, filename="dataset.csv"):
+        """Continue collecting data from a specific date."""
+        try:
+            last_row = read_last_row(filename)
+            if last_row:
+                print(f"Last stored date: {last_row[0]}")
+            print(f"Continue collecting data from: {last_successful_date}")
             start_date = datetime.datetime.strptime(last_successful_date, "%Y-%m-%d").date()
-            new_data = self.scrape_data(start_date.year)
-            
-            # Combine data
-            all_data = existing_data + new_data
-            
-            # Save
-            self.save_to_csv(all_data, filename)
-            print("Data successfully supplemented!")
+            added = self.update_dataset(filename, start_date)
+            print(f"Data successfully supplemented with {added} entries!")
             
         except Exception as e:
             print(f"Continuing collection error: {e}")
 
 
-def main():
+def split_date_range(start_date, end_date, shards):
+    """Split [start_date, end_date] into at most `shards` consecutive ranges of similar length."""
+    total_days = (end_date - start_date).days + 1
+    shards = max(1, min(shards, total_days))
+    bounds = [start_date + datetime.timedelta(days=total_days * i // shards) for i in range(shards + 1)]
+    return [(bounds[i], bounds[i + 1] - datetime.timedelta(days=1)) for i in range(shards)]
+
+
+def _scrape_shard(index, config, calendar_state, start_date, end_date, filename, concurrent, verify):
+    """Worker of scrape_sharded: scrape one date range into its own file."""
+    scraper = CurrencyScraper(**config)
+    scraper.calendar.published, scraper.calendar.gaps = set(calendar_state[0]), set(calendar_state[1])
+    scraper.progress_label = f"[shard {index + 1}] "
+    try:
+        rows = scraper.scrape_to_csv(filename, start_date=start_date, end_date=end_date,
+                                     concurrent=concurrent, verify=verify, compact=False)
+    finally:
+        scraper.close()
+    return index, rows, sorted(scraper.calendar.published), sorted(scraper.calendar.gaps)
+
+
+def parse_args(argv=None):
+    """Command line options of the scraper."""
+    parser = argparse.ArgumentParser(description="Collect CBR exchange rates from the daily archive")
+    parser.add_argument('--start', type=datetime.date.fromisoformat, default=datetime.date(1997, 1, 1),
+                        help="first date, YYYY-MM-DD (default: 1997-01-01)")
+    parser.add_argument('--end', type=datetime.date.fromisoformat, default=None,
+                        help="last date, YYYY-MM-DD (default: today)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of date-range shards fetched in parallel")
+    parser.add_argument('--executor', choices=['process', 'thread'], default='process',
+                        help="worker pool used for the shards")
+    parser.add_argument('--currencies', default='USD',
+                        help="comma-separated currency codes, or 'all'")
+    parser.add_argument('--layout', choices=['wide', 'long'], default='wide',
+                        help="dataset layout for several currencies")
+    parser.add_argument('--rps', type=float, default=10.0,
+                        help="total request budget in requests per second")
+    parser.add_argument('--concurrent', action='store_true',
+                        help="use the asyncio fetch mode")
+    parser.add_argument('--output', default="dataset.csv", help="output CSV file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """The main function of the program."""
-    scraper = CurrencyScraper()
-    
-    # Can start at a later date for the test
-    # start_year = 2020  # instead of 1997
+    args = parse_args(argv)
+    currencies = 'all' if args.currencies == 'all' else args.currencies.split(',')
+    scraper = CurrencyScraper(requests_per_second=args.rps, currencies=currencies, layout=args.layout)
     
-    print("Start dollar exchange rate data collection...")
-    currency_data = scraper.scrape_data()  # start_year=start_year ��� �����
-    
-    if currency_data:
-        success = scraper.save_to_csv(currency_data)
-        if success:
-            print(f"Successfully collected {len(currency_data)} entries")
+    print("Start exchange rate data collection...")
+    try:
+        # Rows are streamed to the output file as they arrive
+        if args.workers > 1:
+            collected = scraper.scrape_sharded(args.output, args.start, args.end, args.workers,
+                                               args.executor, args.concurrent)
         else:
-            print("Data saving error")
+            collected = scraper.scrape_to_csv(args.output, start_date=args.start, end_date=args.end,
+                                              concurrent=args.concurrent)
+    except Exception as e:
+        print(f"Data saving error: {e}")
+        collected = 0
+    finally:
+        scraper.close()
+    
+    if collected:
+        print(f"Successfully collected {collected} entries")
     else:
         print("Data collection failed")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
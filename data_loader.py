@@ -4,25 +4,33 @@ Handles CSV reading, date parsing, and basic data validation
 """
 
 import pandas as pd
-import numpy as np
 from config import DATA_FILE, DATE_COLUMN, VALUE_COLUMN
+from dataset_registry import registry
+from rate_mmap import is_rate_file, open_rate_file
 
 class DataLoader:
-    def __init__(self):
+    def __init__(self, data_file=DATA_FILE):
+        # CSV, '.npz' or memory-mapped '.rates' dataset
+        self.data_file = data_file
         self.data = None
         self.original_data = None
         
     def load_data(self):
         """Load dataset from CSV file and parse dates"""
         try:
-            # Read CSV file
-            self.original_data = pd.read_csv(DATA_FILE)
-            
-            # Convert date column to datetime
-            self.original_data[DATE_COLUMN] = pd.to_datetime(self.original_data[DATE_COLUMN])
-            
-            # Set date as index for time series analysis
-            self.data = self.original_data.set_index(DATE_COLUMN)
+            if is_rate_file(self.data_file):
+                # Rates stay on the mapping: the frame wraps a read-only view
+                self.original_data = None
+                self.data = open_rate_file(self.data_file).series().to_frame(VALUE_COLUMN)
+                self.data.index.name = DATE_COLUMN
+            else:
+                # Shared parsed dataset (binary copy when present)
+                self.original_data = registry.get_frame(self.data_file, DATE_COLUMN)
+                
+                # Set date as index for time series analysis; unlike set_index,
+                # this keeps the rate column on the shared read-only array
+                self.data = self.original_data.copy(deep=False)
+                self.data.index = pd.DatetimeIndex(self.data.pop(DATE_COLUMN), name=DATE_COLUMN)
             
             # Validate data
             self._validate_data()
@@ -31,7 +39,7 @@ class DataLoader:
             return self.data
             
         except FileNotFoundError:
-            print(f"Error: File {DATA_FILE} not found")
+            print(f"Error: File {self.data_file} not found")
             return None
         except Exception as e:
             print(f"Error loading data: {str(e)}")
@@ -8,6 +8,12 @@ import datetime
 from typing import List, Optional, Tuple
 import csv
 
+from dataset_registry import registry
+from partition_cache import PartitionCache, partition_cache
+from partition_manifest import load_manifest
+from partition_writer import write_partitions
+from rate_mmap import is_rate_file, open_rate_file
+
 
 class CurrencyDataProcessor:
     """Class for processing currency data from Laboratory Work 1"""
@@ -30,10 +36,8 @@ class CurrencyDataProcessor:
             DataFrame with currency data
         """
         try:
-            df = pd.read_csv(self.data_file)
-            # Ensure date is in ISO 8601 format
-            df['date'] = pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d')
-            return df
+            # Dates stay datetime64; they are written back as ISO 8601
+            return registry.get_frame(self.data_file)
         except FileNotFoundError:
             print(f"File {self.data_file} not found. Please run scraper first.")
             return pd.DataFrame()
@@ -65,12 +69,13 @@ class CurrencyDataProcessor:
             print(f"Error splitting data: {e}")
             return False
     
-    def split_by_years(self, output_dir: str = "yearly_data") -> List[str]:
+    def split_by_years(self, output_dir: str = "yearly_data", max_workers: int = 4) -> List[str]:
         """
         Split dataset by years into separate files
         
         Args:
             output_dir: Directory to save yearly files
+            max_workers: Number of threads writing files
             
         Returns:
             List of created files
@@ -79,32 +84,15 @@ class CurrencyDataProcessor:
             print("No data available")
             return []
         
-        # Create output directory
-        os.makedirs(output_dir, exist_ok=True)
-        
-        created_files = []
-        self.df['date'] = pd.to_datetime(self.df['date'])
-        
-        for year, group in self.df.groupby(self.df['date'].dt.year):
-            if not group.empty:
-                # Get first and last date in the group
-                start_date = group['date'].min().strftime("%Y%m%d")
-                end_date = group['date'].max().strftime("%Y%m%d")
-                
-                filename = f"{start_date}_{end_date}.csv"
-                filepath = os.path.join(output_dir, filename)
-                
-                group.to_csv(filepath, index=False)
-                created_files.append(filepath)
-        
-        return created_files
+        return write_partitions(self.df, output_dir, 'year', max_workers=max_workers)
     
-    def split_by_weeks(self, output_dir: str = "weekly_data") -> List[str]:
+    def split_by_weeks(self, output_dir: str = "weekly_data", max_workers: int = 4) -> List[str]:
         """
-        Split dataset by weeks into separate files
+        Split dataset by weeks (Sunday-based, as '%Y-%U') into separate files
         
         Args:
             output_dir: Directory to save weekly files
+            max_workers: Number of threads writing files
             
         Returns:
             List of created files
@@ -113,27 +101,7 @@ class CurrencyDataProcessor:
             print("No data available")
             return []
         
-        # Create output directory
-        os.makedirs(output_dir, exist_ok=True)
-        
-        created_files = []
-        self.df['date'] = pd.to_datetime(self.df['date'])
-        self.df['year_week'] = self.df['date'].dt.strftime('%Y-%U')
-        
-        for week, group in self.df.groupby('year_week'):
-            if not group.empty:
-                # Get first and last date in the group
-                start_date = group['date'].min().strftime("%Y%m%d")
-                end_date = group['date'].max().strftime("%Y%m%d")
-                
-                filename = f"{start_date}_{end_date}.csv"
-                filepath = os.path.join(output_dir, filename)
-                
-                # Remove temporary column before saving
-                group.drop('year_week', axis=1).to_csv(filepath, index=False)
-                created_files.append(filepath)
-        
-        return created_files
+        return write_partitions(self.df, output_dir, 'week', max_workers=max_workers)
 
 
 def get_rate_single_file(date: datetime.datetime, filename: str = "dataset.csv") -> Optional[float]:
@@ -142,23 +110,38 @@ def get_rate_single_file(date: datetime.datetime, filename: str = "dataset.csv")
     
     Args:
         date: Date to search for
-        filename: CSV file to search in
+        filename: CSV file, or memory-mapped '.rates' file, to search in
         
     Returns:
         Currency rate or None if not found
     """
     try:
-        df = pd.read_csv(filename)
-        df['date'] = pd.to_datetime(df['date'])
-        date_str = date.strftime('%Y-%m-%d')
-        
-        result = df[df['date'] == date]
-        return result['rate'].iloc[0] if not result.empty else None
+        if is_rate_file(filename):
+            return open_rate_file(filename).index.get(date)
+        return registry.get_rate_index(filename).get(date)
     except Exception as e:
         print(f"Error searching in single file: {e}")
         return None
 
 
+def get_rates_batch(dates, filename: str = "dataset.csv", how: str = 'nan'):
+    """
+    Search for currency rates of many dates in one vectorized pass
+    
+    Args:
+        dates: Series, array or list of dates to search for
+        filename: CSV file, or memory-mapped '.rates' file, to search in
+        how: 'exact', 'asof' or 'nan' handling of dates without a rate
+             (see RateIndex.get_many)
+        
+    Returns:
+        Rates aligned with dates (a Series when dates is a Series)
+    """
+    if is_rate_file(filename):
+        return open_rate_file(filename).index.get_many(dates, how)
+    return registry.get_rate_index(filename).get_many(dates, how)
+
+
 def get_rate_x_y(date: datetime.datetime, x_file: str = "X.csv", y_file: str = "Y.csv") -> Optional[float]:
     """
     Search for currency rate in separated X and Y files
@@ -187,67 +170,90 @@ def get_rate_x_y(date: datetime.datetime, x_file: str = "X.csv", y_file: str = "
         return None
 
 
-def get_rate_year_files(date: datetime.datetime, data_dir: str = "yearly_data") -> Optional[float]:
+def _search_partition(filepath: str, date: datetime.datetime,
+                      cache: Optional[PartitionCache] = None) -> Optional[float]:
+    """
+    Search for currency rate in one partition file
+    
+    Args:
+        filepath: Partition file
+        date: Date to search for
+        cache: Cache of parsed partitions (the shared cache by default)
+        
+    Returns:
+        Currency rate or None if not found
+    """
+    return (cache or partition_cache).get(filepath).get(date)
+
+
+def get_rate_year_files(date: datetime.datetime, data_dir: str = "yearly_data",
+                        cache: Optional[PartitionCache] = None) -> Optional[float]:
     """
     Search for currency rate in yearly split files
     
+    The directory manifest is used to open only the file covering the date;
+    directories written without a manifest are scanned.
+    
     Args:
         date: Date to search for
         data_dir: Directory with yearly files
+        cache: Cache of parsed partitions (the shared cache by default)
         
     Returns:
         Currency rate or None if not found
     """
     try:
+        manifest = load_manifest(data_dir)
+        if manifest is not None:
+            filepath = manifest.locate(date)
+            return _search_partition(filepath, date, cache) if filepath is not None else None
+        
         year = date.year
-        pattern = f"{year}*.csv"
         
         for file in os.listdir(data_dir):
-            if file.startswith(str(year)):
-                filepath = os.path.join(data_dir, file)
-                df = pd.read_csv(filepath)
-                df['date'] = pd.to_datetime(df['date'])
-                
-                date_str = date.strftime('%Y-%m-%d')
-                result = df[df['date'] == date]
-                
-                if not result.empty:
-                    return result['rate'].iloc[0]
+            if file.startswith(str(year)) and file.endswith('.csv'):
+                rate = _search_partition(os.path.join(data_dir, file), date, cache)
+                if rate is not None:
+                    return rate
         return None
     except Exception as e:
         print(f"Error searching in yearly files: {e}")
         return None
 
 
-def get_rate_week_files(date: datetime.datetime, data_dir: str = "weekly_data") -> Optional[float]:
+def get_rate_week_files(date: datetime.datetime, data_dir: str = "weekly_data",
+                        cache: Optional[PartitionCache] = None) -> Optional[float]:
     """
     Search for currency rate in weekly split files
     
+    The directory manifest is used to open only the file covering the date;
+    directories written without a manifest are scanned.
+    
     Args:
         date: Date to search for
         data_dir: Directory with weekly files
+        cache: Cache of parsed partitions (the shared cache by default)
         
     Returns:
         Currency rate or None if not found
     """
     try:
-        date_str_search = date.strftime('%Y%m%d')
+        manifest = load_manifest(data_dir)
+        if manifest is not None:
+            filepath = manifest.locate(date)
+            return _search_partition(filepath, date, cache) if filepath is not None else None
         
         for file in os.listdir(data_dir):
+            if not file.endswith('.csv'):
+                continue
             start_str, end_str = file.replace('.csv', '').split('_')
             start_date = datetime.datetime.strptime(start_str, '%Y%m%d')
             end_date = datetime.datetime.strptime(end_str, '%Y%m%d')
             
             if start_date <= date <= end_date:
-                filepath = os.path.join(data_dir, file)
-                df = pd.read_csv(filepath)
-                df['date'] = pd.to_datetime(df['date'])
-                
-                date_str = date.strftime('%Y-%m-%d')
-                result = df[df['date'] == date]
-                
-                if not result.empty:
-                    return result['rate'].iloc[0]
+                rate = _search_partition(os.path.join(data_dir, file), date, cache)
+                if rate is not None:
+                    return rate
         return None
     except Exception as e:
         print(f"Error searching in weekly files: {e}")
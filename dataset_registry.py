@@ -0,0 +1,141 @@
+"""
+Process-wide registry of parsed datasets
+Every loader of the same file shares one parsed frame instead of parsing it again
+"""
+
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from dataset_storage import binary_path, load_rate_frame
+from rate_index import RateIndex
+
+
+class DatasetRegistry:
+    """
+    Parsed frames keyed by path and load options, validated against the
+    mtime and size of the file and of its binary copy.
+
+    The file is parsed once into a frame whose column arrays are marked
+    read-only. Callers get shallow copies sharing those arrays, so memory
+    stays constant however many loaders there are: writing into a value
+    raises ValueError instead of changing what later callers see, while
+    assigning or adding whole columns only changes the caller's copy.
+    Writers call invalidate after replacing a dataset.
+    """
+
+    def __init__(self):
+        """Initialize DatasetRegistry"""
+        self._lock = threading.Lock()
+        self._entries = {}
+
+        # Counters
+        self.hits = 0
+        self.loads = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _freeze(frame: pd.DataFrame) -> pd.DataFrame:
+        """Frame holding one read-only array per column."""
+        columns = {}
+        for name in frame.columns:
+            values = np.array(frame[name].to_numpy(), copy=True)
+            values.flags.writeable = False
+            columns[name] = values
+        # copy=False keeps the arrays as they are instead of consolidating them
+        return pd.DataFrame(columns, index=frame.index, copy=False)
+
+    @staticmethod
+    def _version(path: str) -> tuple:
+        """mtime and size of the file and of its binary copy."""
+        version = []
+        for candidate in (path, binary_path(path)):
+            try:
+                stat = os.stat(candidate)
+            except FileNotFoundError:
+                version.append(None)
+                continue
+            version.append((stat.st_mtime_ns, stat.st_size))
+        if version == [None, None]:
+            raise FileNotFoundError(f"No such file: '{path}'")
+        return tuple(version)
+
+    def _entry(self, path: str, date_column: str, parse_dates: bool) -> dict:
+        """Registry entry of a dataset, loading it when missing or outdated."""
+        key = (os.path.abspath(path), date_column, parse_dates)
+        version = self._version(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['version'] == version:
+                self.hits += 1
+                return entry
+
+            frame = self._freeze(load_rate_frame(path, date_column, parse_dates))
+            entry = {'version': version, 'frame': frame, 'indexes': {}}
+            self._entries[key] = entry
+            self.loads += 1
+            return entry
+
+    def get_frame(self, path: str, date_column: str = 'date', parse_dates: bool = True) -> pd.DataFrame:
+        """
+        Shared parsed frame of a dataset
+
+        Args:
+            path: CSV, '.npz' or '.rates' dataset
+            date_column: Name of the date column
+            parse_dates: Dates as datetime64 (True) or as text (see load_rate_frame)
+
+        Returns:
+            Shallow copy of the shared read-only DataFrame
+        """
+        return self._entry(path, date_column, parse_dates)['frame'].copy(deep=False)
+
+    def get_rate_index(self, path: str, date_column: str = 'date',
+                       value_column: str = 'rate') -> RateIndex:
+        """
+        Shared RateIndex of a dataset, built once per version of the file
+
+        Args:
+            path: CSV, '.npz' or '.rates' dataset
+            date_column: Name of the date column
+            value_column: Name of the rate column
+
+        Returns:
+            RateIndex over the dataset
+        """
+        entry = self._entry(path, date_column, True)
+        with self._lock:
+            index = entry['indexes'].get(value_column)
+            if index is None:
+                index = RateIndex.from_frame(entry['frame'], date_column, value_column)
+                entry['indexes'][value_column] = index
+            return index
+
+    def invalidate(self, path: Optional[str] = None):
+        """Drop the parsed frames of a file, or of all files when path is None."""
+        with self._lock:
+            if path is None:
+                keys = list(self._entries)
+            else:
+                target = os.path.abspath(path)
+                keys = [key for key in self._entries if key[0] == target]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+
+    def stats(self) -> dict:
+        """Return the registry counters."""
+        with self._lock:
+            return {
+                'datasets': len(self._entries),
+                'hits': self.hits,
+                'loads': self.loads,
+                'invalidations': self.invalidations,
+            }
+
+
+# Shared by all loaders of the process
+registry = DatasetRegistry()
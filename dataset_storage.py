@@ -0,0 +1,282 @@
+"""
+Binary columnar storage for the rate dataset
+A '.npz' copy of dataset.csv stores the dates as int64 epoch days and every
+column as a typed array, so loading it is a memory copy instead of a text parse
+"""
+
+import argparse
+import csv
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from rate_mmap import is_rate_file, open_rate_file
+
+
+BINARY_SUFFIX = '.npz'
+
+ISO_DATE_FORMAT = '%Y-%m-%d'
+
+# Text columns of the scraper layouts
+TEXT_COLUMNS = ('currency',)
+
+# Rate column of the single-currency layout; the wide layout names them by currency code
+RATE_COLUMN = 'rate'
+
+
+def binary_path(csv_path: str) -> str:
+    """Path of the binary copy of a CSV dataset ('dataset.csv' -> 'dataset.npz')."""
+    return os.path.splitext(csv_path)[0] + BINARY_SUFFIX
+
+
+def _fresh_binary(csv_path: str):
+    """Binary copy of a CSV file if it exists and is not older than the CSV, else None."""
+    npz_path = binary_path(csv_path)
+    try:
+        npz_mtime = os.stat(npz_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    try:
+        csv_mtime = os.stat(csv_path).st_mtime_ns
+    except FileNotFoundError:
+        return npz_path
+    return npz_path if npz_mtime >= csv_mtime else None
+
+
+def save_binary(df: pd.DataFrame, path: str, date_column: str = 'date') -> str:
+    """
+    Write a frame in the binary columnar format
+
+    Args:
+        df: Data with a date column; other columns must be numeric or text
+        path: Target '.npz' file
+        date_column: Name of the date column
+
+    Returns:
+        Path of the written file
+    """
+    columns = list(df.columns)
+    arrays = {'__columns__': np.array(columns, dtype=str)}
+    for column in columns:
+        values = df[column]
+        if column == date_column:
+            arrays[column] = pd.to_datetime(values).values.astype('datetime64[D]').astype(np.int64)
+        elif pd.api.types.is_numeric_dtype(values):
+            arrays[column] = values.to_numpy(dtype=np.float64)
+        else:
+            # Fixed-width unicode keeps the file loadable without pickle
+            arrays[column] = values.astype(str).to_numpy(dtype=str)
+
+    temp_path = f"{path}.tmp.npz"
+    np.savez(temp_path, **arrays)
+    os.replace(temp_path, path)
+    return path
+
+
+def load_binary(path: str, date_column: str = 'date') -> pd.DataFrame:
+    """
+    Read a frame written by save_binary
+
+    Args:
+        path: '.npz' file
+        date_column: Name of the date column
+
+    Returns:
+        DataFrame with the date column as datetime64 and the columns in stored order
+    """
+    with np.load(path, allow_pickle=False) as data:
+        columns = [str(column) for column in data['__columns__']]
+        frame = {}
+        for column in columns:
+            values = data[column]
+            if column == date_column:
+                # pandas picks its own resolution for day precision
+                values = values.astype('datetime64[D]')
+            frame[column] = values
+    return pd.DataFrame(frame, columns=columns)
+
+
+def _pyarrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def read_rate_csv(path: str, date_column: str = 'date', dtypes: dict = None,
+                  date_format: str = ISO_DATE_FORMAT, engine: str = 'auto') -> pd.DataFrame:
+    """
+    Read a rate CSV with explicit column types and date format
+
+    The columns of the scraper layouts are not inferred: the date column
+    is parsed with date_format into datetime64, text columns stay strings
+    and rate columns ('rate' or currency codes) are read as float64. Other
+    columns are left to pandas, and a file whose rate columns do not parse
+    as numbers is read without dtypes. ISO dates are converted by NumPy in
+    one cast; files whose dates do not match date_format fall back to
+    inferred date parsing.
+
+    Args:
+        path: CSV file
+        date_column: Name of the date column
+        dtypes: Column types (derived from the header by default)
+        date_format: strftime format of the dates
+        engine: pandas parser: 'c', 'pyarrow', or 'auto' for pyarrow when installed
+
+    Returns:
+        DataFrame with the date column as datetime64
+    """
+    if dtypes is None:
+        with open(path, 'r', newline='', encoding='utf-8') as file:
+            header = next(csv.reader(file), [])
+        dtypes = {}
+        for column in header:
+            if column in TEXT_COLUMNS or column == date_column:
+                # Plain object strings are cheaper to build than a string dtype
+                dtypes[column] = object
+            elif _is_rate_column(column):
+                dtypes[column] = np.float64
+    if engine == 'auto':
+        engine = 'pyarrow' if _pyarrow_available() else 'c'
+    if engine == 'pyarrow' and date_format == ISO_DATE_FORMAT and dtypes.get(date_column) is object:
+        # pyarrow parses ISO dates natively; as object it would build
+        # datetime.date objects that are slow to convert
+        dtypes = {**dtypes, date_column: 'timestamp[s][pyarrow]'}
+
+    try:
+        df = pd.read_csv(path, dtype=dtypes, engine=engine)
+    except ValueError:
+        df = pd.read_csv(path, engine=engine)
+    if date_column in df and isinstance(df[date_column].dtype, pd.ArrowDtype):
+        df[date_column] = df[date_column].to_numpy(dtype='datetime64[s]')
+    elif date_column in df and not pd.api.types.is_datetime64_any_dtype(df[date_column]):
+        df[date_column] = _parse_dates(df[date_column], date_format)
+    return df
+
+
+def _is_rate_column(column: str) -> bool:
+    """True for the rate columns of the scraper layouts: 'rate' or a currency code."""
+    return column == RATE_COLUMN or (len(column) == 3 and column.isalpha() and column.isupper())
+
+
+def _parse_dates(values: pd.Series, date_format: str):
+    """Parse a text date column, trying the fastest parser that fits the format."""
+    if date_format == ISO_DATE_FORMAT:
+        try:
+            return values.to_numpy(dtype=object).astype('datetime64[D]')
+        except (TypeError, ValueError):
+            pass
+    try:
+        return pd.to_datetime(values, format=date_format)
+    except ValueError:
+        return pd.to_datetime(values)
+
+
+def convert_csv(csv_path: str = "dataset.csv", target: str = None,
+                date_column: str = 'date') -> str:
+    """
+    Convert a CSV dataset to the binary columnar format
+
+    Args:
+        csv_path: Source CSV file
+        target: Target '.npz' file (next to the CSV by default)
+        date_column: Name of the date column
+
+    Returns:
+        Path of the written file
+    """
+    df = read_rate_csv(csv_path, date_column)
+    return save_binary(df, target or binary_path(csv_path), date_column)
+
+
+def load_rate_frame(path: str, date_column: str = 'date', parse_dates: bool = True) -> pd.DataFrame:
+    """
+    Load a dataset from its binary copy when available, else from CSV
+
+    A '.npz' next to a CSV file is used only if it is at least as new as
+    the CSV, so a rewritten CSV is never shadowed by stale binary data.
+
+    Args:
+        path: CSV, '.npz' or memory-mapped '.rates' dataset
+        date_column: Name of the date column
+        parse_dates: Return dates as datetime64 (True) or as text: the CSV
+                     values unchanged, or ISO strings from a binary copy
+
+    Returns:
+        DataFrame with the dataset columns
+    """
+    if is_rate_file(path):
+        df = open_rate_file(path).frame(date_column)
+        if not parse_dates:
+            df[date_column] = df[date_column].dt.strftime('%Y-%m-%d')
+        return df
+    if path.endswith(BINARY_SUFFIX):
+        npz_path = path
+    else:
+        npz_path = _fresh_binary(path)
+
+    if npz_path is not None:
+        df = load_binary(npz_path, date_column)
+        if not parse_dates and date_column in df:
+            df[date_column] = df[date_column].dt.strftime('%Y-%m-%d')
+        return df
+
+    if parse_dates:
+        return read_rate_csv(path, date_column)
+    return pd.read_csv(path)
+
+
+def benchmark_ingestion(rows: int = 1_000_000, path: str = "benchmark_dataset.csv", repeat: int = 3):
+    """
+    Compare generic and typed CSV loading on a synthetic daily series
+
+    Args:
+        rows: Number of rows of the synthetic series
+        path: Temporary CSV file, removed afterwards
+        repeat: Runs per loader; the fastest is reported
+    """
+    # A million consecutive days do not fit in datetime64[ns], which the
+    # generic path parses into, so the dates cycle over 100,000 days
+    days = (np.arange(rows) % 100_000).astype('timedelta64[D]')
+    dates = np.datetime64('1970-01-01', 'D') + days
+    rates = np.round(60 + np.cumsum(np.random.default_rng(42).normal(0, 0.1, rows)), 4)
+    pd.DataFrame({'date': dates.astype(str), 'rate': rates}).to_csv(path, index=False)
+
+    def generic():
+        df = pd.read_csv(path)
+        df['date'] = pd.to_datetime(df['date'])
+        return df
+
+    candidates = [('read_csv + to_datetime', generic),
+                  ('read_rate_csv (c)', lambda: read_rate_csv(path, engine='c'))]
+    if _pyarrow_available():
+        candidates.append(('read_rate_csv (pyarrow)', lambda: read_rate_csv(path, engine='pyarrow')))
+
+    try:
+        print(f"Loading {rows} rows (best of {repeat})")
+        for name, load in candidates:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                load()
+                timings.append(time.perf_counter() - start)
+            print(f"  {name:<26} {min(timings):.3f} s")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert rate datasets to the binary format")
+    parser.add_argument('sources', nargs='*', default=["dataset.csv"], help="CSV files to convert")
+    parser.add_argument('--benchmark', type=int, metavar='ROWS',
+                        help="Time CSV ingestion on a synthetic series instead of converting")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark_ingestion(args.benchmark)
+    else:
+        for source in args.sources:
+            print(f"Converted {source} -> {convert_csv(source)}")
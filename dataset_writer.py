@@ -0,0 +1,116 @@
+"""
+Streaming CSV output for the web scraper
+Writes rows as they are produced and publishes the file atomically
+"""
+
+import csv
+import io
+import os
+
+from dataset_registry import registry
+
+
+class StreamingCSVWriter:
+    """
+    Append rows to '<filename>.part' and rename it over filename on commit.
+
+    Readers of filename never see a half-written dataset, and memory use
+    does not depend on the number of rows. Used as a context manager the
+    file is committed on success and discarded on error.
+    """
+
+    def __init__(self, filename, header, fsync_every=1000):
+        """
+        Initialize StreamingCSVWriter
+
+        Args:
+            filename: Final CSV file
+            header: Column names written at the top of the file
+            fsync_every: Number of rows between two fsync calls
+        """
+        self.filename = filename
+        self.temp_filename = f"{filename}.part"
+        self.fsync_every = fsync_every
+        self.rows_written = 0
+        self._pending = 0
+
+        # A leftover part file belongs to an aborted run
+        if os.path.exists(self.temp_filename):
+            os.remove(self.temp_filename)
+        self._file = open(self.temp_filename, 'a', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(header)
+
+    def write_row(self, row):
+        """Append one row."""
+        self._writer.writerow(row)
+        self.rows_written += 1
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def write_rows(self, rows):
+        """Append several rows."""
+        for row in rows:
+            self.write_row(row)
+
+    def commit(self):
+        """Sync the part file and atomically replace the target with it."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.temp_filename, self.filename)
+        # Readers of this process must not keep the old contents
+        registry.invalidate(self.filename)
+
+    def abort(self):
+        """Discard the part file and leave the target untouched."""
+        self._file.close()
+        if os.path.exists(self.temp_filename):
+            os.remove(self.temp_filename)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
+
+
+def read_last_row(filename, block_size=4096):
+    """
+    Read the last data row of a CSV file without parsing the rest of it.
+
+    The file is read backwards in blocks until a complete last line is
+    found, so the cost does not depend on the file size.
+
+    Returns:
+        List of fields, or None for a missing file or a header-only file
+    """
+    try:
+        with open(filename, 'rb') as file:
+            file.seek(0, os.SEEK_END)
+            position = file.tell()
+            tail = b''
+            while position > 0:
+                step = min(block_size, position)
+                position -= step
+                file.seek(position)
+                tail = file.read(step) + tail
+                lines = tail.rstrip(b'\r\n').splitlines()
+                # The first line may be cut unless the whole file is read
+                if len(lines) > 1 or position == 0:
+                    break
+    except FileNotFoundError:
+        return None
+
+    lines = tail.rstrip(b'\r\n').splitlines()
+    if position == 0 and len(lines) < 2:
+        return None
+    last_line = lines[-1].decode('utf-8')
+    return next(csv.reader(io.StringIO(last_line)), None)
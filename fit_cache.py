@@ -0,0 +1,231 @@
+"""
+Cache of fitted ARIMA/SARIMA parameters
+Refitting the same model on the same data rebuilds the results from the
+stored parameters instead of running the optimizer again
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Fit arguments that do not change the estimated parameters
+IGNORED_FIT_ARGS = ('disp',)
+
+
+class FitCache:
+    """
+    Fitted parameters keyed by a fingerprint of the data and the model spec.
+
+    The key hashes the endogenous (and exogenous) values, the index, the
+    model class, all its constructor arguments (order, seasonal_order,
+    trend, enforce_* flags, initialization...) and the fit arguments.
+    The constructor arguments come from the models' _get_init_kwds(),
+    which statsmodels itself uses to clone models. On a hit the results
+    are rebuilt with one Kalman smoother pass over the stored parameters,
+    which gives the same estimates, forecasts and residuals as the fit.
+
+    Entries live in an in-memory LRU of max_entries and, when cache_dir is
+    set (or use_disk is called, as the main scripts and GUIs do), in
+    '.npz' files capped at max_disk_bytes (least recently used evicted
+    first) so that later runs share them. The directory is created by the
+    first write and scanned once; after that its size is tracked as files
+    are written and evicted.
+    """
+
+    def __init__(self, max_entries: int = 256, cache_dir: Optional[str] = None,
+                 max_disk_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize FitCache
+
+        Args:
+            max_entries: Number of parameter sets kept in memory
+            cache_dir: Directory of the on-disk layer (None keeps the cache in memory)
+            max_disk_bytes: Size cap of the cache directory
+        """
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # Files of the disk layer in LRU order, name -> size; None until scanned
+        self._disk_files = None
+        self._disk_bytes = 0
+
+        # Counters
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(model, **fit_kwargs) -> str:
+        """
+        Fingerprint of a model's data, specification and fit arguments
+
+        Args:
+            model: Unfitted statsmodels state space model (ARIMA, SARIMAX)
+            fit_kwargs: Arguments that will be passed to fit
+
+        Returns:
+            Hex digest identifying the fit
+        """
+        digest = hashlib.sha256()
+        digest.update(type(model).__name__.encode('utf-8'))
+        digest.update(np.ascontiguousarray(model.endog, dtype=np.float64).tobytes())
+        if model.exog is not None:
+            digest.update(np.ascontiguousarray(model.exog, dtype=np.float64).tobytes())
+
+        labels = model.data.row_labels
+        if labels is not None:
+            digest.update(pd.util.hash_pandas_object(pd.Index(labels), index=False).values.tobytes())
+
+        # Every constructor argument of the model, so no two specs share a key
+        spec = sorted(model._get_init_kwds().items())
+        arguments = sorted((name, value) for name, value in fit_kwargs.items()
+                           if name not in IGNORED_FIT_ARGS)
+        digest.update(repr((spec, arguments)).encode('utf-8'))
+        return digest.hexdigest()
+
+    def use_disk(self, cache_dir: str = "model_cache", max_disk_bytes: Optional[int] = None):
+        """
+        Turn on the on-disk layer
+
+        Args:
+            cache_dir: Directory of the '.npz' files
+            max_disk_bytes: Size cap of the directory (unchanged when None)
+        """
+        with self._lock:
+            self.cache_dir = cache_dir
+            if max_disk_bytes is not None:
+                self.max_disk_bytes = max_disk_bytes
+            self._disk_files = None
+            self._disk_bytes = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def _scan_disk(self):
+        """Index the files already in the cache directory, oldest first. Call with the lock held."""
+        if self._disk_files is not None:
+            return
+        files = []
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            names = []
+        for name in names:
+            if name.endswith('.tmp.npz') or not name.endswith('.npz'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            files.append((stat.st_mtime, name, stat.st_size))
+        self._disk_files = OrderedDict((name, size) for _, name, size in sorted(files))
+        self._disk_bytes = sum(self._disk_files.values())
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Stored parameters of a fit, or None when it is not cached."""
+        with self._lock:
+            params = self._entries.get(key)
+            if params is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return params
+
+        if self.cache_dir:
+            try:
+                with np.load(self._path(key), allow_pickle=False) as data:
+                    params = data['params']
+                os.utime(self._path(key))
+            except (OSError, ValueError, KeyError):
+                params = None
+            if params is not None:
+                self._remember(key, params)
+                with self._lock:
+                    self.disk_hits += 1
+                    self._scan_disk()
+                    name = f"{key}.npz"
+                    if name in self._disk_files:
+                        self._disk_files.move_to_end(name)
+                return params
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, params: np.ndarray):
+        """Store the parameters of a fit."""
+        params = np.asarray(params, dtype=np.float64)
+        self._remember(key, params)
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+            np.savez(temp_path, params=params)
+            size = os.path.getsize(temp_path)
+            os.replace(temp_path, self._path(key))
+            self._track_disk(f"{key}.npz", size)
+
+    def _remember(self, key: str, params: np.ndarray):
+        with self._lock:
+            self._entries[key] = params
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _track_disk(self, name: str, size: int):
+        """Account for a written file and delete the least recently used files over the size cap."""
+        with self._lock:
+            self._scan_disk()
+            self._disk_bytes += size - self._disk_files.pop(name, 0)
+            self._disk_files[name] = size
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk_files) > 1:
+                oldest, oldest_size = self._disk_files.popitem(last=False)
+                self._disk_bytes -= oldest_size
+                try:
+                    os.remove(os.path.join(self.cache_dir, oldest))
+                except OSError:
+                    continue
+                self.evictions += 1
+
+    def fit(self, model, **fit_kwargs):
+        """
+        Fit a model, or rebuild its results from cached parameters
+
+        Args:
+            model: Unfitted statsmodels state space model (ARIMA, SARIMAX)
+            fit_kwargs: Arguments passed to model.fit on a miss
+
+        Returns:
+            Fitted results
+        """
+        key = self.key(model, **fit_kwargs)
+        params = self.get(key)
+        if params is not None:
+            return model.smooth(params, cov_type=fit_kwargs.get('cov_type'))
+
+        results = model.fit(**fit_kwargs)
+        self.put(key, results.params)
+        return results
+
+    def stats(self) -> dict:
+        """Return the cache counters."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+# Shared by the model fitting code; in memory until an entry point calls fit_cache.use_disk()
+fit_cache = FitCache()
@@ -8,6 +8,9 @@ import numpy as np
 from scipy import stats
 import matplotlib.pyplot as plt
 
+from dataset_registry import registry
+from dataset_storage import BINARY_SUFFIX
+
 
 class DataAnalyzer:
     """
@@ -31,8 +34,8 @@ class DataAnalyzer:
             pandas.DataFrame: Loaded data
         """
         try:
-            if filepath.endswith('.csv'):
-                self.current_data = pd.read_csv(filepath)
+            if filepath.endswith('.csv') or filepath.endswith(BINARY_SUFFIX):
+                self.current_data = registry.get_frame(filepath, parse_dates=False)
             elif filepath.endswith('.xlsx'):
                 self.current_data = pd.read_excel(filepath)
             else:
@@ -3,13 +3,15 @@ Main application for time series analysis and forecasting
 Orchestrates the complete analysis workflow
 """
 
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
 from data_loader import DataLoader
 from exploratory_analysis import ExploratoryAnalysis
 from stationarity_analysis import StationarityAnalysis
 from arima_model import ARIMAModel
-from config import VALUE_COLUMN
+from config import VALUE_COLUMN, MODEL_CACHE_DIR
+from fit_cache import fit_cache
 
 def main():
     print("=== TIME SERIES ANALYSIS OF EXCHANGE RATE DATA ===\n")
@@ -59,8 +61,8 @@ def main():
     # Prepare data (split into train/test)
     arima_model.prepare_data(test_size=0.2)
     
-    # Train model with automatic parameter selection
-    arima_model.train_model()
+    # Train model with automatic parameter selection, one fit per core
+    arima_model.train_model(workers=os.cpu_count() or 1)
     
     # Validate model
     metrics, forecast = arima_model.validate_model()
@@ -136,4 +138,6 @@ if __name__ == "__main__":
     if not os.path.exists('results'):
         os.makedirs('results')
     
+    # Reuse model fits of earlier runs
+    fit_cache.use_disk(MODEL_CACHE_DIR)
     main()
\ No newline at end of file
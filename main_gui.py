@@ -21,6 +21,7 @@ except ImportError as e:
 try:
     from data_processor import CurrencyDataProcessor, get_rate_single_file, get_rate_x_y, get_rate_year_files, get_rate_week_files
     from annotation_creator import create_annotation_file, create_reorganized_dataset
+    from dataset_registry import registry
     LAB3_AVAILABLE = True
 except ImportError as e:
     LAB3_AVAILABLE = False
@@ -298,6 +299,7 @@ class IntegratedAnalyticsPlatform:
             
             # Correct method call with start year
             data = scraper.scrape_data(start_year=start_year)
+            scraper.close()
             
             if data and len(data) > 0:
                 # Convert data to DataFrame for compatibility
@@ -427,6 +429,10 @@ class IntegratedAnalyticsPlatform:
         
         self.lab3_log.see(tk.END)
 
+    def get_rate_index(self, dataset_file):
+        """Return the date index of a dataset, rebuilding it only when the file changes"""
+        return registry.get_rate_index(dataset_file)
+
     def search_date(self):
         """Search for data on specific date"""
         if not self.dataset_path:
@@ -451,7 +457,7 @@ class IntegratedAnalyticsPlatform:
             dataset_file = os.path.join(self.dataset_path, "dataset.csv")
             
             if search_method == "Single File":
-                rate = get_rate_single_file(search_date, dataset_file)
+                rate = self.get_rate_index(dataset_file).get(search_date)
             elif search_method == "X/Y Files":
                 x_file = os.path.join(self.dataset_path, "X.csv")
                 y_file = os.path.join(self.dataset_path, "Y.csv")
@@ -600,6 +606,11 @@ class IntegratedAnalyticsPlatform:
 
 def main():
     """Main application entry point"""
+    # Reuse model fits of earlier runs
+    from config import MODEL_CACHE_DIR
+    from fit_cache import fit_cache
+    fit_cache.use_disk(MODEL_CACHE_DIR)
+    
     root = tk.Tk()
     app = IntegratedAnalyticsPlatform(root)
     root.mainloop()
@@ -543,6 +543,11 @@ class IntegratedAnalyticsPlatform:
 
 def main():
     """Main application entry point"""
+    # Reuse model fits of earlier runs
+    from config import MODEL_CACHE_DIR
+    from fit_cache import fit_cache
+    fit_cache.use_disk(MODEL_CACHE_DIR)
+    
     root = tk.Tk()
     app = IntegratedAnalyticsPlatform(root)
     root.mainloop()
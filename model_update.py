@@ -0,0 +1,51 @@
+"""
+Incremental updates of fitted ARIMA/SARIMA models
+Extends a fitted model with newly scraped observations instead of refitting
+it from default starting parameters
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+# filter: keep the parameters and run the Kalman filter/smoother over the extended series
+# refit: re-estimate, starting the optimizer from the previous parameters
+UPDATE_MODES = ('filter', 'refit')
+
+
+def extend_fit(results, new_observations, mode: str = 'filter', **fit_kwargs):
+    """
+    Extend fitted results with observations that follow the fitted data
+
+    The model is cloned over the old and new observations, so irregular
+    date indexes (business days without a frequency) are supported.
+
+    Args:
+        results: Fitted statsmodels state space results (ARIMA, SARIMAX)
+        new_observations: Series or array of the observations after the fitted data
+        mode: 'filter' or 'refit' (see UPDATE_MODES)
+        fit_kwargs: Extra arguments to fit in 'refit' mode
+
+    Returns:
+        Results over the extended series
+    """
+    if mode not in UPDATE_MODES:
+        raise ValueError(f"mode must be one of {UPDATE_MODES}, got {mode!r}")
+
+    endog = results.model.data.orig_endog
+    if isinstance(endog, (pd.Series, pd.DataFrame)):
+        if not isinstance(new_observations, (pd.Series, pd.DataFrame)):
+            raise TypeError("new_observations must be a pandas Series when the model was fitted on one")
+        extended = pd.concat([endog, new_observations])
+    else:
+        extended = np.concatenate([np.asarray(endog), np.asarray(new_observations)])
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        model = results.model.clone(extended)
+        if mode == 'filter':
+            return model.smooth(results.params)
+        fit_kwargs.setdefault('start_params', results.params)
+        return model.fit(**fit_kwargs)
@@ -0,0 +1,106 @@
+"""
+In-memory LRU cache of parsed partition files
+Repeated lookups in the same yearly or weekly file skip the CSV parse
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from rate_index import RateIndex
+
+
+class PartitionCache:
+    """
+    Bounded cache of RateIndex objects built from partition files.
+
+    Entries are keyed by path and validated against the file's mtime and
+    size, so a rewritten partition is parsed again. The least recently used
+    partitions are evicted once max_partitions or max_bytes is exceeded.
+    """
+
+    def __init__(self, max_partitions: Optional[int] = 64, max_bytes: Optional[int] = None):
+        """
+        Initialize PartitionCache
+
+        Args:
+            max_partitions: Number of partitions kept (None for no limit)
+            max_bytes: Memory cap of the parsed arrays in bytes (None for no limit)
+        """
+        self.max_partitions = max_partitions
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _version(path: str) -> tuple:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, path: str) -> RateIndex:
+        """
+        Return the parsed partition, reading the file only on a miss
+
+        Args:
+            path: Partition CSV file with date and rate columns
+
+        Returns:
+            RateIndex over the partition
+        """
+        key = os.path.abspath(path)
+        version = self._version(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        index = RateIndex.from_csv(path)
+        nbytes = index.days.nbytes + index.rates.nbytes
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[2]
+            self._entries[key] = (version, index, nbytes)
+            self._size += nbytes
+            while len(self._entries) > 1 and self._over_limit():
+                _, (_, _, size) = self._entries.popitem(last=False)
+                self._size -= size
+                self.evictions += 1
+        return index
+
+    def _over_limit(self) -> bool:
+        if self.max_partitions is not None and len(self._entries) > self.max_partitions:
+            return True
+        return self.max_bytes is not None and self._size > self.max_bytes
+
+    def clear(self):
+        """Drop all cached partitions."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        """Return the cache counters."""
+        with self._lock:
+            return {
+                'partitions': len(self._entries),
+                'bytes': self._size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+# Shared by the partition lookups of data_processor
+partition_cache = PartitionCache()
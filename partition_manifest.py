@@ -0,0 +1,144 @@
+"""
+Manifest of the partition files written by the dataset splitters
+Lets date lookups find the one partition holding a date without a directory scan
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from rate_index import DateLike, to_epoch_days
+
+
+MANIFEST_FILE = "manifest.json"
+
+# Loaded manifests by directory, reloaded when the manifest file changes
+_manifests: Dict[str, tuple] = {}
+_manifests_lock = threading.Lock()
+
+
+def write_manifest(output_dir: str, entries: List[dict]) -> str:
+    """
+    Write the manifest of a partitioned directory atomically
+
+    Args:
+        output_dir: Directory holding the partition files
+        entries: One dict per partition with 'file' (name inside output_dir),
+                 'start' and 'end' (ISO dates), 'rows' and 'bytes'
+
+    Returns:
+        Path of the manifest file
+    """
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    temp_path = f"{path}.tmp"
+    entries = sorted(entries, key=lambda entry: entry['start'])
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump({'version': 1, 'partitions': entries}, file)
+    os.replace(temp_path, path)
+    return path
+
+
+class PartitionManifest:
+    """
+    Sorted start/end epoch days of the partitions of one directory
+
+    Partitions do not overlap, so the partition of a date is found with
+    one binary search over the start days.
+    """
+
+    def __init__(self, directory: str, entries: List[dict]):
+        """
+        Initialize PartitionManifest
+
+        Args:
+            directory: Directory holding the partition files
+            entries: Partition entries as written by write_manifest
+        """
+        entries = sorted(entries, key=lambda entry: entry['start'])
+        self.directory = directory
+        self.entries = entries
+        self.starts = np.array([to_epoch_days(entry['start']) for entry in entries], dtype=np.int64)
+        self.ends = np.array([to_epoch_days(entry['end']) for entry in entries], dtype=np.int64)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional['PartitionManifest']:
+        """
+        Read the manifest of a directory
+
+        Returns:
+            PartitionManifest or None if the directory has no manifest
+        """
+        path = os.path.join(directory, MANIFEST_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        return cls(directory, data.get('partitions', []))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def find(self, date: DateLike) -> Optional[dict]:
+        """
+        Find the partition whose date range contains a date
+
+        Args:
+            date: Date to search for
+
+        Returns:
+            Manifest entry or None if no partition covers the date
+        """
+        day = to_epoch_days(date)
+        position = int(np.searchsorted(self.starts, day, side='right')) - 1
+        if position < 0 or day > self.ends[position]:
+            return None
+        return self.entries[position]
+
+    def locate(self, date: DateLike) -> Optional[str]:
+        """
+        Path of the partition file that may hold a date
+
+        Args:
+            date: Date to search for
+
+        Returns:
+            File path or None if no partition covers the date
+        """
+        entry = self.find(date)
+        return os.path.join(self.directory, entry['file']) if entry is not None else None
+
+
+def load_manifest(directory: str) -> Optional[PartitionManifest]:
+    """
+    Load the manifest of a directory once and reuse it for later lookups
+
+    The cached manifest is dropped when the manifest file is rewritten.
+
+    Args:
+        directory: Directory holding the partition files
+
+    Returns:
+        PartitionManifest or None if the directory has no manifest
+    """
+    path = os.path.join(directory, MANIFEST_FILE)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    version = (stat.st_mtime_ns, stat.st_size)
+    key = os.path.abspath(directory)
+
+    with _manifests_lock:
+        cached = _manifests.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    manifest = PartitionManifest.load(directory)
+    if manifest is not None:
+        with _manifests_lock:
+            _manifests[key] = (version, manifest)
+    return manifest
@@ -0,0 +1,106 @@
+"""
+Single-pass writer of yearly and weekly partition files
+Computes integer partition keys with vectorized arithmetic and writes the
+partitions concurrently, leaving the source frame untouched
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from partition_manifest import write_manifest
+
+
+PARTITION_PERIODS = ('year', 'week')
+
+# 1970-01-01 was a Thursday: day 0 has Sunday-based weekday 4
+EPOCH_SUNDAY_WEEKDAY = 4
+
+
+def partition_keys(days: np.ndarray, period: str) -> np.ndarray:
+    """
+    Integer partition key of every epoch day
+
+    Args:
+        days: int64 epoch days
+        period: 'year' for the calendar year, 'week' for the year and
+                Sunday-based week number ('%Y-%U') encoded as year * 100 + week
+
+    Returns:
+        int64 array of keys, ordered like the periods
+    """
+    if period not in PARTITION_PERIODS:
+        raise ValueError(f"period must be one of {PARTITION_PERIODS}, got {period!r}")
+
+    years = days.astype('datetime64[D]').astype('datetime64[Y]')
+    if period == 'year':
+        return years.astype(np.int64) + 1970
+
+    # %U: days before the first Sunday of the year are week 0
+    day_of_year = days - years.astype('datetime64[D]').astype(np.int64)
+    weekday = (days + EPOCH_SUNDAY_WEEKDAY) % 7
+    weeks = (day_of_year + 7 - weekday) // 7
+    return (years.astype(np.int64) + 1970) * 100 + weeks
+
+
+def _write_partition(part: pd.DataFrame, days: np.ndarray, output_dir: str) -> dict:
+    """Write one partition file and return its manifest entry."""
+    start = pd.Timestamp(days.min(), unit='D')
+    end = pd.Timestamp(days.max(), unit='D')
+    filename = f"{start.strftime('%Y%m%d')}_{end.strftime('%Y%m%d')}.csv"
+    filepath = os.path.join(output_dir, filename)
+    part.to_csv(filepath, index=False)
+    return {
+        'file': filename,
+        'start': start.strftime('%Y-%m-%d'),
+        'end': end.strftime('%Y-%m-%d'),
+        'rows': len(part),
+        'bytes': os.path.getsize(filepath),
+    }
+
+
+def write_partitions(df: pd.DataFrame, output_dir: str, period: str = 'year',
+                     date_column: str = 'date', max_workers: int = 4) -> List[str]:
+    """
+    Split a frame into one CSV file per period and write the directory manifest
+
+    Files are named '<first date>_<last date>.csv'. The frame is sorted by
+    partition key once (skipped when already in order) and every partition
+    is a positional slice of it.
+
+    Args:
+        df: Source data; it is not modified
+        output_dir: Directory to save the partition files
+        period: 'year' or 'week'
+        date_column: Name of the date column
+        max_workers: Number of threads writing files
+
+    Returns:
+        List of created files, in period order
+    """
+    if df.empty:
+        return []
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    days = pd.to_datetime(df[date_column]).values.astype('datetime64[D]').astype(np.int64)
+    keys = partition_keys(days, period)
+    if np.any(keys[1:] < keys[:-1]):
+        # Stable, so rows keep their order inside a partition
+        order = np.argsort(keys, kind='stable')
+        df, days, keys = df.iloc[order], days[order], keys[order]
+
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1, [len(keys)]))
+    slices = list(zip(bounds[:-1], bounds[1:]))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        entries = list(executor.map(
+            lambda bound: _write_partition(df.iloc[bound[0]:bound[1]],
+                                           days[bound[0]:bound[1]], output_dir),
+            slices))
+
+    write_manifest(output_dir, entries)
+    return [os.path.join(output_dir, entry['file']) for entry in entries]
@@ -0,0 +1,110 @@
+"""
+Calendar of archive publication days learned from previous scraping runs
+Lets the scraper skip weekends and holidays it already knows have no data
+"""
+
+import datetime
+import json
+import os
+
+
+class PublicationCalendar:
+    """
+    Persistent record of which dates have an archive file.
+
+    Dates that returned 404 are remembered as gaps. The weekday pattern
+    is learned from all observed dates: every weekday is assumed to be
+    a publication weekday until it has returned at least min_observations
+    404s and most of its observed dates had no data. A weekday is only
+    ever excluded on evidence, so an empty calendar skips nothing.
+    """
+
+    def __init__(self, path="publication_calendar.json", min_observations=20):
+        """
+        Initialize PublicationCalendar
+
+        Args:
+            path: JSON file the calendar is persisted to (None keeps it in memory)
+            min_observations: 404s needed before a weekday can be excluded
+        """
+        self.path = path
+        self.min_observations = min_observations
+        self.published = set()
+        self.gaps = set()
+        self._weekdays = None
+        self.load()
+
+    def load(self):
+        """Load the calendar saved by a previous run."""
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as file:
+            data = json.load(file)
+        self.published = set(data.get('published', []))
+        self.gaps = set(data.get('gaps', []))
+        self._weekdays = None
+
+    def save(self):
+        """Write the calendar atomically."""
+        if not self.path:
+            return
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'published': sorted(self.published), 'gaps': sorted(self.gaps)}, file)
+        os.replace(temp_path, self.path)
+
+    def record(self, date, status):
+        """
+        Learn from the outcome of one fetched day.
+
+        Only dates before today are final: today's file may simply not
+        be published yet. A file without the requested currencies
+        ('absent') is still a publication day; only a 404 ('missing')
+        is a gap.
+        """
+        if date >= datetime.date.today():
+            return
+        date_str = date.strftime("%Y-%m-%d")
+        if status in ('ok', 'absent'):
+            self.published.add(date_str)
+            self.gaps.discard(date_str)
+        elif status == 'missing':
+            self.gaps.add(date_str)
+            self.published.discard(date_str)
+        else:
+            return
+        self._weekdays = None
+
+    def learn_published(self, date_strs):
+        """Mark dates already present in a dataset ('YYYY-MM-DD') as publication days."""
+        self.published.update(date_strs)
+        self.gaps -= self.published
+        self._weekdays = None
+
+    def weekday_pattern(self):
+        """Weekdays on which the archive is usually published."""
+        if self._weekdays is None:
+            published = [0] * 7
+            missing = [0] * 7
+            for date_str in self.published:
+                published[datetime.date.fromisoformat(date_str).weekday()] += 1
+            for date_str in self.gaps:
+                missing[datetime.date.fromisoformat(date_str).weekday()] += 1
+
+            weekdays = []
+            for weekday in range(7):
+                if missing[weekday] < self.min_observations or published[weekday] >= missing[weekday]:
+                    weekdays.append(weekday)
+            self._weekdays = tuple(weekdays)
+        return self._weekdays
+
+    def is_known_gap(self, date):
+        """True when the date is expected to have no archive file."""
+        date_str = date.strftime("%Y-%m-%d")
+        if date_str in self.published:
+            return False
+        return date_str in self.gaps or date.weekday() not in self.weekday_pattern()
+
+    def filter_dates(self, dates):
+        """Drop the dates known to have no archive file."""
+        return [date for date in dates if not self.is_known_gap(date)]
@@ -0,0 +1,233 @@
+"""
+In-memory date index for currency rate lookups
+Loads a dataset once and answers date queries with binary search
+"""
+
+import datetime
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+DateLike = Union[datetime.date, datetime.datetime, pd.Timestamp, np.datetime64, str]
+DatesLike = Union[pd.Series, pd.DatetimeIndex, np.ndarray, Sequence[DateLike]]
+
+# Missing-date policies of RateIndex.get_many
+LOOKUP_MODES = ('exact', 'asof', 'nan')
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+def to_epoch_days(date: DateLike) -> int:
+    """
+    Convert a date to the number of days since 1970-01-01
+
+    Args:
+        date: Date, datetime, Timestamp, datetime64 or ISO string
+
+    Returns:
+        Epoch day number
+    """
+    # datetime and Timestamp are date subclasses
+    if isinstance(date, datetime.date):
+        return date.toordinal() - EPOCH_ORDINAL
+    return int(np.datetime64(pd.Timestamp(date).date(), 'D').astype(np.int64))
+
+
+def to_epoch_days_array(dates: DatesLike) -> np.ndarray:
+    """
+    Convert many dates to epoch days in one vectorized pass
+
+    Args:
+        dates: Series, DatetimeIndex, array or list of dates
+
+    Returns:
+        int64 array of epoch days; missing dates (NaT) become the int64 minimum
+    """
+    values = pd.to_datetime(pd.Series(dates) if not isinstance(dates, pd.Series) else dates)
+    return values.values.astype('datetime64[D]').astype(np.int64)
+
+
+class RateIndex:
+    """
+    Sorted int64 array of epoch days with a parallel float64 array of rates
+
+    Built once per dataset and shared by all lookups, so a query costs a
+    binary search instead of a CSV parse.
+    """
+
+    def __init__(self, days: np.ndarray, rates: np.ndarray):
+        """
+        Initialize RateIndex
+
+        Args:
+            days: Epoch days of the observations
+            rates: Rates aligned with days
+        """
+        days = np.asarray(days, dtype=np.int64)
+        rates = np.asarray(rates, dtype=np.float64)
+
+        # Stable sort keeps the first of duplicated dates first
+        order = np.argsort(days, kind='stable')
+        days, rates = days[order], rates[order]
+        keep = np.ones(len(days), dtype=bool)
+        keep[1:] = days[1:] != days[:-1]
+
+        self.days = days[keep]
+        self.rates = rates[keep]
+
+    @classmethod
+    def from_sorted(cls, days: np.ndarray, rates: np.ndarray) -> 'RateIndex':
+        """
+        Wrap arrays that are already sorted by date without duplicates
+
+        The arrays are used as they are, without a copy, so read-only or
+        memory-mapped arrays stay shared.
+
+        Args:
+            days: Strictly increasing integer epoch days
+            rates: Rates aligned with days
+
+        Returns:
+            RateIndex over the arrays
+        """
+        index = cls.__new__(cls)
+        index.days = days
+        index.rates = rates
+        return index
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, date_column: str = 'date',
+                   value_column: str = 'rate') -> 'RateIndex':
+        """
+        Build an index from a DataFrame with date and rate columns
+
+        Args:
+            df: Source data
+            date_column: Name of the date column
+            value_column: Name of the rate column
+
+        Returns:
+            RateIndex over the frame
+        """
+        dates = pd.to_datetime(df[date_column]).values.astype('datetime64[D]')
+        return cls(dates.astype(np.int64), df[value_column].to_numpy(dtype=np.float64))
+
+    @classmethod
+    def from_csv(cls, filename: str = "dataset.csv", date_column: str = 'date',
+                 value_column: str = 'rate') -> 'RateIndex':
+        """
+        Build an index from a CSV dataset
+
+        Args:
+            filename: CSV file with date and rate columns
+            date_column: Name of the date column
+            value_column: Name of the rate column
+
+        Returns:
+            RateIndex over the file
+        """
+        return cls.from_frame(pd.read_csv(filename), date_column, value_column)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def __contains__(self, date: DateLike) -> bool:
+        return self._position(to_epoch_days(date)) is not None
+
+    def _position(self, day: int) -> Optional[int]:
+        """Array position of an epoch day, or None if it is not stored."""
+        position = int(np.searchsorted(self.days, day))
+        if position < len(self.days) and self.days[position] == day:
+            return position
+        return None
+
+    def get(self, date: DateLike) -> Optional[float]:
+        """
+        Look up the rate published for a date
+
+        Args:
+            date: Date to search for
+
+        Returns:
+            Currency rate or None if not found
+        """
+        position = self._position(to_epoch_days(date))
+        return float(self.rates[position]) if position is not None else None
+
+    def as_of(self, date: DateLike) -> Optional[Tuple[datetime.date, float]]:
+        """
+        Find the last rate published on or before a date
+
+        Weekends and holidays resolve to the previous publication day.
+
+        Args:
+            date: Date to search for
+
+        Returns:
+            (publication date, rate) or None if the date precedes the data
+        """
+        position = int(np.searchsorted(self.days, to_epoch_days(date), side='right')) - 1
+        if position < 0:
+            return None
+        published = datetime.date.fromordinal(int(self.days[position]) + EPOCH_ORDINAL)
+        return published, float(self.rates[position])
+
+    def range(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> pd.Series:
+        """
+        Slice the rates published between two dates
+
+        Args:
+            start: First date included (open when None)
+            end: Last date included (open when None)
+
+        Returns:
+            Series of rates indexed by date; the values are a view of the index arrays
+        """
+        low = 0 if start is None else int(np.searchsorted(self.days, to_epoch_days(start)))
+        high = len(self.days) if end is None else int(
+            np.searchsorted(self.days, to_epoch_days(end), side='right'))
+        high = max(low, high)
+        index = pd.DatetimeIndex(self.days[low:high].astype('datetime64[D]'), name='date')
+        return pd.Series(self.rates[low:high], index=index, name='rate', copy=False)
+
+    def get_many(self, dates: DatesLike, how: str = 'nan') -> Union[np.ndarray, pd.Series]:
+        """
+        Look up the rates of many dates in one vectorized pass
+
+        Args:
+            dates: Series, DatetimeIndex, array or list of dates
+            how: Handling of dates without a published rate:
+                'exact' raises KeyError, 'asof' takes the last rate
+                published on or before the date, 'nan' returns NaN
+
+        Returns:
+            float64 array aligned with dates, or a Series with the same
+            index when dates is a Series
+        """
+        if how not in LOOKUP_MODES:
+            raise ValueError(f"how must be one of {LOOKUP_MODES}, got {how!r}")
+
+        days = to_epoch_days_array(dates)
+        valid = days != np.iinfo(np.int64).min
+        result = np.full(len(days), np.nan)
+        if len(self.days) == 0:
+            positions = np.full(len(days), -1)
+            found = np.zeros(len(days), dtype=bool)
+        elif how == 'asof':
+            # Last stored day on or before each date
+            positions = np.searchsorted(self.days, days, side='right') - 1
+            found = valid & (positions >= 0)
+        else:
+            positions = np.searchsorted(self.days, days).clip(max=len(self.days) - 1)
+            found = valid & (self.days[positions] == days)
+
+        if how == 'exact' and not found.all():
+            missing = pd.to_datetime(days[~found].astype('datetime64[D]'), errors='coerce')
+            raise KeyError(f"No rate for {len(missing)} dates, first: {missing[0]}")
+
+        result[found] = self.rates[positions[found]]
+        if isinstance(dates, pd.Series):
+            return pd.Series(result, index=dates.index, name='rate')
+        return result
@@ -0,0 +1,112 @@
+"""
+Adaptive token-bucket rate limiter for the web scraper
+Paces requests and backs off when the server signals overload
+"""
+
+import asyncio
+import threading
+import time
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by all requests of a scraper.
+
+    Tokens refill at the current rate (requests per second). The rate is
+    cut multiplicatively on throttling signals (429, 5xx, timeouts) and
+    grows back additively on successful responses, up to max_rate.
+    The limiter is thread-safe and can be used from asyncio code.
+    """
+
+    def __init__(self, rate=10.0, burst=None, min_rate=0.5, max_rate=None,
+                 decrease_factor=0.5, increase_step=0.5):
+        """
+        Initialize AdaptiveRateLimiter
+
+        Args:
+            rate: Initial rate in requests per second
+            burst: Bucket capacity (defaults to one second of requests)
+            min_rate: Lowest rate the limiter backs off to
+            max_rate: Highest rate it recovers to (defaults to rate)
+            decrease_factor: Rate multiplier applied on a throttling signal
+            increase_step: Rate added after each successful response
+        """
+        self.rate = float(rate)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate or rate)
+        self.burst = float(burst or max(1.0, rate))
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+        # Counters
+        self.acquired = 0
+        self.waits = 0
+        self.wait_time = 0.0
+        self.throttle_events = 0
+
+    def _reserve(self):
+        """Take one token and return how long the caller has to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+            # A negative balance reserves tokens for callers already waiting
+            self._tokens -= 1
+            delay = max(0.0, -self._tokens / self.rate, self._paused_until - now)
+
+            self.acquired += 1
+            if delay > 0:
+                self.waits += 1
+                self.wait_time += delay
+            return delay
+
+    def acquire(self):
+        """Block until a request may be sent. Returns the seconds waited."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self):
+        """Asynchronous counterpart of acquire."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def on_success(self):
+        """Speed up after a healthy response."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self, retry_after=None):
+        """
+        Slow down after a 429/5xx response or a timeout.
+
+        Args:
+            retry_after: Seconds from a Retry-After header; when given,
+                no request is released before that delay has passed
+        """
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            # Tokens saved at the old rate would defeat the slowdown
+            self._tokens = min(self._tokens, 0.0)
+            self.throttle_events += 1
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def stats(self):
+        """Return the limiter counters."""
+        return {
+            'rate': round(self.rate, 3),
+            'acquired': self.acquired,
+            'waits': self.waits,
+            'wait_time': round(self.wait_time, 3),
+            'throttle_events': self.throttle_events,
+        }
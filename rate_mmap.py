@@ -0,0 +1,209 @@
+"""
+Memory-mapped fixed-width storage of a rate series
+A '.rates' file holds a small header, the dates as int32 epoch days and the
+rates as float64, so readers map it instead of loading it into memory
+"""
+
+import mmap
+import os
+import struct
+import sys
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from rate_index import RateIndex
+
+
+MMAP_SUFFIX = '.rates'
+
+# magic, format version, reserved, row count, byte offset of the rates array
+HEADER = struct.Struct('<8sIIQQ')
+MAGIC = b'RATEMMAP'
+VERSION = 1
+
+# Open mappings by path; a rewritten file gets a new mapping, and the old
+# one is unmapped once its last holder drops it
+_mapped: Dict[str, tuple] = {}
+_mapped_lock = threading.Lock()
+
+
+def _rates_offset(count: int) -> int:
+    """Offset of the rates array: after the dates, aligned to 8 bytes."""
+    end_of_dates = HEADER.size + 4 * count
+    return (end_of_dates + 7) // 8 * 8
+
+
+def write_rate_file(path: str, days: np.ndarray, rates: np.ndarray) -> str:
+    """
+    Write a rate series in the memory-mapped layout
+
+    The series is sorted by date and duplicated dates are dropped, as in
+    RateIndex, so readers can binary-search the mapped arrays directly.
+
+    Args:
+        path: Target '.rates' file
+        days: Epoch days of the observations
+        rates: Rates aligned with days
+
+    Returns:
+        Path of the written file
+    """
+    index = RateIndex(days, rates)
+    count = len(index)
+    offset = _rates_offset(count)
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, 0, count, offset))
+        file.write(index.days.astype('<i4').tobytes())
+        file.write(b'\0' * (offset - HEADER.size - 4 * count))
+        file.write(index.rates.astype('<f8').tobytes())
+    # Windows cannot replace a file that is still mapped: drop the shared
+    # mapping so it is unmapped unless a caller still holds it
+    release_rate_file(path)
+    os.replace(temp_path, path)
+    return path
+
+
+def convert_to_rate_file(source: str = "dataset.csv", target: str = None,
+                         date_column: str = 'date', value_column: str = 'rate') -> str:
+    """
+    Convert one rate column of a dataset to the memory-mapped layout
+
+    Args:
+        source: CSV or '.npz' dataset
+        target: Target file ('<source>.rates' without the extension by default)
+        date_column: Name of the date column
+        value_column: Column to store (one file per currency)
+
+    Returns:
+        Path of the written file
+    """
+    # dataset_storage reads rate files through this module
+    from dataset_storage import load_rate_frame
+
+    df = load_rate_frame(source, date_column)
+    days = df[date_column].values.astype('datetime64[D]').astype(np.int64)
+    target = target or os.path.splitext(source)[0] + MMAP_SUFFIX
+    return write_rate_file(target, days, df[value_column].to_numpy(dtype=np.float64))
+
+
+class MappedRates:
+    """
+    Read-only view of a '.rates' file
+
+    days and rates are NumPy arrays backed by the mapping: nothing is read
+    until it is accessed, and processes mapping the same file share the OS
+    page cache.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize MappedRates
+
+        Args:
+            path: '.rates' file written by write_rate_file
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, count, offset = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} rate file")
+
+        self.days = np.frombuffer(self._mmap, dtype='<i4', count=count, offset=HEADER.size)
+        self.rates = np.frombuffer(self._mmap, dtype='<f8', count=count, offset=offset)
+        self.index = RateIndex.from_sorted(self.days, self.rates)
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def series(self) -> pd.Series:
+        """
+        Whole series as a pandas Series
+
+        The values are a view of the mapping; only the date index is built.
+        """
+        return self.index.range()
+
+    def frame(self, date_column: str = 'date', value_column: str = 'rate') -> pd.DataFrame:
+        """
+        Series as a frame with date and rate columns, like a loaded CSV
+
+        The frame holds copies of the mapped arrays; use series() to keep
+        the rates on the mapping.
+        """
+        return self.series().rename(value_column).rename_axis(date_column).reset_index()
+
+    def close(self) -> bool:
+        """
+        Unmap the file; for a caller that owns this object, the shared
+        ones from open_rate_file are unmapped when they are dropped
+
+        Returns:
+            False when views of the mapping are still alive: the mapping is
+            then released once the last of them is garbage collected
+        """
+        self.index = None
+        self.days = None
+        self.rates = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            return False
+        return True
+
+
+def open_rate_file(path: str) -> MappedRates:
+    """
+    Map a '.rates' file once and share the mapping between callers
+
+    A rewritten file gets a new MappedRates; objects handed out earlier
+    keep working on the old version until their holders drop them.
+
+    Args:
+        path: '.rates' file
+
+    Returns:
+        MappedRates over the file
+    """
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    key = os.path.abspath(path)
+
+    with _mapped_lock:
+        cached = _mapped.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        mapped = MappedRates(path)
+        _mapped[key] = (version, mapped)
+    return mapped
+
+
+def release_rate_file(path: str):
+    """
+    Forget the shared mapping of a '.rates' file
+
+    The mapping is not closed under callers that still hold it: it is
+    unmapped when the last reference to it goes away.
+
+    Args:
+        path: '.rates' file
+    """
+    with _mapped_lock:
+        _mapped.pop(os.path.abspath(path), None)
+
+
+def is_rate_file(path: Optional[str]) -> bool:
+    """True when a path names a memory-mapped rate file."""
+    return bool(path) and path.endswith(MMAP_SUFFIX)
+
+
+if __name__ == "__main__":
+    for source in sys.argv[1:] or ["dataset.csv"]:
+        print(f"Converted {source} -> {convert_to_rate_file(source)}")
@@ -0,0 +1,181 @@
+"""
+On-disk HTTP response cache for the web scraper
+Keeps archive responses so repeated runs do not hit the network
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class ResponseCache:
+    """
+    Content cache of successful responses, keyed by URL.
+
+    Each entry is one file named after the SHA-256 of the URL: a JSON
+    metadata line (URL, ETag, Last-Modified) followed by the body.
+    The total size is capped at max_bytes; the least recently used
+    entries are evicted first. File modification times carry the usage
+    order across runs.
+    """
+
+    def __init__(self, cache_dir="http_cache", max_bytes=512 * 1024 * 1024):
+        """
+        Initialize ResponseCache
+
+        Args:
+            cache_dir: Directory holding the cached responses
+            max_bytes: Size cap of the cache directory
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """Rebuild the LRU order from the files already on disk."""
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.tmp'):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            files.append((stat.st_mtime, name, stat.st_size))
+
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._size += size
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def get(self, url):
+        """
+        Read a cached entry.
+
+        Returns:
+            (metadata, body) or None when the URL is not cached
+        """
+        key = self._key(url)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+
+        try:
+            with open(self._path(key), 'rb') as file:
+                metadata = json.loads(file.readline())
+                body = file.read()
+            os.utime(self._path(key))
+        except (OSError, ValueError):
+            self._discard(key)
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return metadata, body
+
+    def put(self, url, response):
+        """Store a successful response and evict old entries over the size cap."""
+        key = self._key(url)
+        metadata = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_type': response.headers.get('Content-Type'),
+        }
+        payload = json.dumps(metadata).encode('utf-8') + b'\n' + response.content
+
+        temp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(payload)
+        os.replace(temp_path, self._path(key))
+
+        with self._lock:
+            self._size += len(payload) - self._entries.pop(key, 0)
+            self._entries[key] = len(payload)
+            evicted = []
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                old_key, size = self._entries.popitem(last=False)
+                self._size -= size
+                self.evictions += 1
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    def _discard(self, key):
+        """Forget an unreadable entry."""
+        with self._lock:
+            self._size -= self._entries.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def validators(self, metadata):
+        """Conditional request headers for revalidating an entry."""
+        headers = {}
+        if metadata.get('etag'):
+            headers['If-None-Match'] = metadata['etag']
+        if metadata.get('last_modified'):
+            headers['If-Modified-Since'] = metadata['last_modified']
+        return headers
+
+    def to_response(self, url, metadata, body):
+        """Rebuild a requests.Response from a cached entry."""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response._content = body
+        response.headers = CaseInsensitiveDict({
+            name: value for name, value in (
+                ('ETag', metadata.get('etag')),
+                ('Last-Modified', metadata.get('last_modified')),
+                ('Content-Type', metadata.get('content_type')),
+            ) if value
+        })
+        response.from_cache = True
+        return response
+
+    def revalidate(self, url, metadata, body):
+        """Serve an entry the server confirmed unchanged (304)."""
+        with self._lock:
+            self.revalidated += 1
+        return self.to_response(url, metadata, body)
+
+    def stats(self):
+        """Return the cache counters."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'revalidated': self.revalidated,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,152 @@
+"""
+Append-only checkpoint journal for long scraping runs
+Records every fetched day so an interrupted run can be resumed
+"""
+
+import csv
+import os
+
+# Journal statuses: a rate was received, the archive has no file for
+# the day (404), the file has none of the requested currencies, or all
+# attempts failed and the day must be retried.
+STATUS_OK = 'ok'
+STATUS_MISSING = 'missing'
+STATUS_ABSENT = 'absent'
+STATUS_FAILED = 'failed'
+
+STATUSES = (STATUS_OK, STATUS_MISSING, STATUS_ABSENT, STATUS_FAILED)
+
+# First field of the header line holding the scraper configuration
+CONFIG_MARKER = '#config'
+
+
+class ScrapeJournal:
+    """
+    Append-only journal with one line per fetched day:
+    date, status, then currency/rate pairs (USD,90.1,EUR,98.3).
+
+    Every record is flushed to the OS as soon as it is written, so it
+    survives a crash of the process. fsync is batched every fsync_every
+    records to bound the data lost on a power failure.
+
+    When a config string is given, it is written as the first line. A
+    journal written under another configuration (or without one) replays
+    as empty and is started afresh by the first record.
+    """
+
+    def __init__(self, path, fsync_every=50, config=None):
+        """
+        Initialize ScrapeJournal
+
+        Args:
+            path: Journal file path
+            fsync_every: Number of records between two fsync calls
+            config: Configuration the records depend on (currencies, layout)
+        """
+        self.path = path
+        self.fsync_every = fsync_every
+        self.config = config
+        self._file = None
+        self._writer = None
+        self._pending = 0
+
+    def replay(self):
+        """
+        Read the records of a previous run.
+
+        A torn last line left by a crash is ignored. Later records for
+        the same date override earlier ones.
+
+        Returns:
+            Dictionary {date: (status, {currency: rate})}
+        """
+        records = {}
+        if not os.path.exists(self.path) or not self._matches_config():
+            return records
+
+        with open(self.path, 'r', newline='', encoding='utf-8') as file:
+            lines = file.read().split('\n')
+        # Only lines terminated by a newline were written completely
+        for row in csv.reader(lines[:-1]):
+            if row and row[0] == CONFIG_MARKER:
+                continue
+            if len(row) < 2 or len(row) % 2 or row[1] not in STATUSES:
+                continue
+            if row[1] == STATUS_OK and len(row) == 2:
+                continue
+            records[row[0]] = (row[1], dict(zip(row[2::2], row[3::2])))
+        return records
+
+    def _stored_config(self):
+        """Configuration in the header of the journal file, or None."""
+        with open(self.path, 'r', newline='', encoding='utf-8') as file:
+            first_line = file.readline()
+        if not first_line.endswith('\n'):
+            return None
+        row = next(csv.reader([first_line]), [])
+        if len(row) == 2 and row[0] == CONFIG_MARKER:
+            return row[1]
+        return None
+
+    def _matches_config(self):
+        """True when the records on disk were written under this configuration."""
+        return self.config is None or self._stored_config() == self.config
+
+    def record(self, date, status, rates=None):
+        """Append one record to the journal."""
+        if self._file is None:
+            self._open()
+
+        row = [date, status]
+        for code, value in (rates or {}).items():
+            row.extend([code, value])
+        self._writer.writerow(row)
+        self._file.flush()
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.sync()
+
+    def _open(self):
+        """
+        Open the journal for appending after the last complete line, or
+        start it afresh when it was written under another configuration.
+        """
+        exists = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+        if exists and not self._matches_config():
+            exists = False
+        if not exists:
+            self._file = open(self.path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._file)
+            if self.config is not None:
+                self._writer.writerow([CONFIG_MARKER, self.config])
+            return
+
+        with open(self.path, 'rb') as file:
+            file.seek(-1, os.SEEK_END)
+            torn_tail = file.read(1) != b'\n'
+
+        self._file = open(self.path, 'a', newline='', encoding='utf-8')
+        if torn_tail:
+            # Terminate a line cut by a crash so it cannot merge with the next record
+            self._file.write('\n')
+        self._writer = csv.writer(self._file)
+
+    def sync(self):
+        """Force the written records to disk."""
+        if self._file is not None and self._pending:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def close(self):
+        """Sync and close the journal file."""
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+    def remove(self):
+        """Delete the journal once its records have been compacted."""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
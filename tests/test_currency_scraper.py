@@ -0,0 +1,175 @@
+"""
+Tests of CurrencyScraper against a local stub of the archive server
+"""
+
+import csv
+import datetime
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from currency_scrapper_v2 import CurrencyScraper
+from scrape_journal import ScrapeJournal, STATUS_OK
+
+
+START = datetime.date(2020, 1, 1)
+END = datetime.date(2020, 1, 20)
+# Days the stub has no file for
+MISSING = {datetime.date(2020, 1, 5), datetime.date(2020, 1, 12)}
+
+
+def stub_rate(date):
+    """USD rate served by the stub for a date."""
+    return 60 + date.day / 100
+
+
+class ArchiveStub(BaseHTTPRequestHandler):
+    """Serves daily_json.js files in the layout of the archive."""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests[self.path] += 1
+            attempts = server.requests[self.path]
+
+        try:
+            year, month, day, name = self.path.strip('/').split('/')
+            date = datetime.date(int(year), int(month), int(day))
+        except ValueError:
+            self.send_error(404)
+            return
+        if name != 'daily_json.js' or date in MISSING:
+            self.send_error(404)
+            return
+        if attempts <= server.failures.get(date, 0):
+            self.send_error(503)
+            return
+
+        body = json.dumps({'Valute': {
+            'USD': {'Value': stub_rate(date)},
+            'EUR': {'Value': stub_rate(date) + 10},
+        }}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/javascript')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class CurrencyScraperStubTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), ArchiveStub)
+        self.server.lock = threading.Lock()
+        self.server.requests = Counter()
+        self.server.failures = {}
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.workdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def make_scraper(self, **kwargs):
+        options = {
+            'base_url': f"http://127.0.0.1:{self.server.server_address[1]}",
+            'requests_per_second': 1000.0,
+            'max_concurrency': 4,
+            'cache_dir': None,
+            'calendar_file': None,
+            'journal_file': None,
+        }
+        options.update(kwargs)
+        scraper = CurrencyScraper(**options)
+        scraper.retry_backoff = 0.0
+        self.addCleanup(scraper.close)
+        return scraper
+
+    def path_of(self, date):
+        return date.strftime('/%Y/%m/%d/daily_json.js')
+
+    def expected_rows(self):
+        dates = [START + datetime.timedelta(days=i) for i in range((END - START).days + 1)]
+        return [(date.strftime('%Y-%m-%d'), stub_rate(date)) for date in dates if date not in MISSING]
+
+    def test_sequential_and_concurrent_rows_match(self):
+        scraper = self.make_scraper()
+        dates = scraper._date_range(START, END)
+
+        sequential = scraper.scrape_dates(dates)
+        concurrent = scraper.scrape_dates(dates, concurrent=True)
+
+        self.assertEqual(sequential, self.expected_rows())
+        self.assertEqual(concurrent, sequential)
+
+    def test_server_error_is_retried(self):
+        failing = datetime.date(2020, 1, 8)
+        self.server.failures[failing] = 2
+        scraper = self.make_scraper()
+
+        status, result = scraper.fetch_rates(failing)
+
+        self.assertEqual(status, STATUS_OK)
+        self.assertEqual(result, ('2020-01-08', {'USD': stub_rate(failing)}))
+        self.assertEqual(self.server.requests[self.path_of(failing)], 3)
+
+    def test_missing_day_is_not_retried(self):
+        missing = datetime.date(2020, 1, 5)
+        scraper = self.make_scraper()
+
+        self.assertEqual(scraper.fetch_rates(missing), ('missing', None))
+        self.assertEqual(self.server.requests[self.path_of(missing)], 1)
+
+    def test_resume_from_journal(self):
+        filename = os.path.join(self.workdir, 'dataset.csv')
+        scraper = self.make_scraper()
+        # Journal of an interrupted run that got through the first days
+        journal = ScrapeJournal(f"{filename}.journal", config=scraper._journal_config())
+        journaled = [START + datetime.timedelta(days=i) for i in range(3)]
+        for date in journaled:
+            journal.record(date.strftime('%Y-%m-%d'), STATUS_OK, {'USD': repr(stub_rate(date))})
+        journal.close()
+
+        written = scraper.scrape_to_csv(filename, start_date=START, end_date=END)
+
+        for date in journaled:
+            self.assertEqual(self.server.requests[self.path_of(date)], 0)
+        with open(filename, newline='', encoding='utf-8') as file:
+            rows = [(date, float(rate)) for date, rate in list(csv.reader(file))[1:]]
+        self.assertEqual(rows, self.expected_rows())
+        self.assertEqual(written, len(rows))
+        self.assertFalse(os.path.exists(f"{filename}.journal"))
+
+    def test_journal_of_other_currencies_is_not_resumed(self):
+        filename = os.path.join(self.workdir, 'dataset.csv')
+        usd_scraper = self.make_scraper()
+        journal = ScrapeJournal(f"{filename}.journal", config=usd_scraper._journal_config())
+        journal.record(START.strftime('%Y-%m-%d'), STATUS_OK, {'USD': repr(stub_rate(START))})
+        journal.close()
+
+        scraper = self.make_scraper(currencies=('USD', 'EUR'))
+        scraper.scrape_to_csv(filename, start_date=START, end_date=START)
+
+        self.assertEqual(self.server.requests[self.path_of(START)], 1)
+        with open(filename, newline='', encoding='utf-8') as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(rows[0], ['date', 'USD', 'EUR'])
+        self.assertEqual([float(value) for value in rows[1][1:]],
+                         [stub_rate(START), stub_rate(START) + 10])
+
+
+if __name__ == '__main__':
+    unittest.main()
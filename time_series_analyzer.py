@@ -12,6 +12,11 @@ from statsmodels.tsa.arima.model import ARIMA
 from statsmodels.tsa.stattools import adfuller
 from sklearn.metrics import mean_squared_error
 
+from config import MODEL_CACHE_DIR
+from dataset_registry import registry
+from fit_cache import fit_cache
+from model_update import extend_fit
+
 
 class TimeSeriesAnalyzer:
     """
@@ -38,8 +43,8 @@ class TimeSeriesAnalyzer:
             pandas.DataFrame: Loaded and preprocessed data
         """
         try:
-            # Read data from CSV file
-            self.data = pd.read_csv(filepath)
+            # Shared parsed data of the CSV file (or its binary copy)
+            self.data = registry.get_frame(filepath, date_column)
             
             # Rename columns to standard format
             self.data.columns = [col.lower().replace(' ', '_') for col in self.data.columns]
@@ -154,7 +159,7 @@ class TimeSeriesAnalyzer:
             series = data[timeseries_column].dropna()
             
             self.model = ARIMA(series, order=order)
-            self.model_fitted = self.model.fit()
+            self.model_fitted = fit_cache.fit(self.model)
             
             print(f"ARIMA{order} model fitted successfully")
             print(f"Model AIC: {self.model_fitted.aic:.4f}")
@@ -165,6 +170,36 @@ class TimeSeriesAnalyzer:
         except Exception as e:
             raise Exception(f"ARIMA model fitting failed: {str(e)}")
     
+    def update_arima(self, new_data, timeseries_column='rate', mode='filter'):
+        """
+        Extend the fitted ARIMA model with new observations
+        
+        Args:
+            new_data (pandas.DataFrame): Rows following the data of the fitted model
+            timeseries_column (str): Column to model
+            mode (str): 'filter' keeps the fitted parameters and only runs the
+                        Kalman filter; 'refit' re-estimates starting from them
+            
+        Returns:
+            Updated fitted ARIMA model
+        """
+        if self.model_fitted is None:
+            raise ValueError("No fitted model available. Please fit ARIMA model first.")
+        
+        try:
+            series = new_data[timeseries_column].dropna()
+            
+            self.model_fitted = extend_fit(self.model_fitted, series, mode)
+            self.model = self.model_fitted.model
+            
+            print(f"ARIMA model updated with {len(series)} observations ({mode})")
+            print(f"Model AIC: {self.model_fitted.aic:.4f}")
+            
+            return self.model_fitted
+            
+        except Exception as e:
+            raise Exception(f"ARIMA model update failed: {str(e)}")
+    
     def forecast_arima(self, steps=30):
         """
         Generate forecast using fitted ARIMA model
@@ -257,6 +292,7 @@ def analyze_time_series(filepath):
 
 if __name__ == "__main__":
     """Test the time series analyzer"""
+    fit_cache.use_disk(MODEL_CACHE_DIR)
     try:
         analyzer = TimeSeriesAnalyzer()
         data = analyzer.load_data('dataset.csv')